@@ -1,5 +1,19 @@
 import discord
 from discord.ext import commands
+import asyncio
+from datetime import timedelta
+from typing import Literal, Optional, Union
+
+# Bulk deletes: Discord takes up to 100 IDs per call, only for messages
+# younger than 14 days (a minute of slack for clock skew); older ones go
+# one at a time.
+BULK_BATCH = 100
+BULK_MAX_AGE = timedelta(days=14) - timedelta(minutes=1)
+SEQUENTIAL_DELAY = 1.0
+SCAN_LIMIT = 1000
+MAX_LAST_COUNT = 500
+PROGRESS_EVERY = 10
+
 
 class MessageManager(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -23,5 +37,123 @@ class MessageManager(commands.Cog):
         except discord.HTTPException as e:
             await ctx.send(f"❌ Failed to delete message: {e}", delete_after=2)
 
+    # ===========================
+    # Bulk deletion
+    # ===========================
+    @commands.group(
+        name="bulkdelete",
+        help="Deletes many messages in this channel: by ID list, ID range or last N by author/bot. Add 'dry' to only count.",
+        invoke_without_command=True
+    )
+    @commands.is_owner()
+    async def bulk_delete(self, ctx: commands.Context):
+        await ctx.send(
+            "Usage: `!bulkdelete ids <id> <id> … [dry]`, `!bulkdelete range <first_id> <last_id> [dry]`, "
+            "`!bulkdelete last <n> <@member|bot> [dry]`",
+            delete_after=15
+        )
+
+    @bulk_delete.command(name="ids", help="Deletes the given message IDs.")
+    @commands.is_owner()
+    async def bulk_delete_ids(
+        self, ctx: commands.Context, message_ids: commands.Greedy[int], dry: Optional[Literal["dry"]] = None
+    ):
+        await self.run_bulk_delete(ctx, list(dict.fromkeys(message_ids)), dry is not None)
+
+    @bulk_delete.command(name="range", help="Deletes every message between two IDs, inclusive.")
+    @commands.is_owner()
+    async def bulk_delete_range(
+        self, ctx: commands.Context, first_id: int, last_id: int, dry: Optional[Literal["dry"]] = None
+    ):
+        if first_id > last_id:
+            first_id, last_id = last_id, first_id
+        message_ids = [
+            message.id
+            async for message in ctx.channel.history(
+                limit=SCAN_LIMIT,
+                after=discord.Object(id=first_id - 1),
+                before=discord.Object(id=last_id + 1),
+                oldest_first=True
+            )
+            if message.id != ctx.message.id
+        ]
+        await self.run_bulk_delete(ctx, message_ids, dry is not None)
+
+    @bulk_delete.command(name="last", help="Deletes the last N messages by a member, or by this bot.")
+    @commands.is_owner()
+    async def bulk_delete_last(
+        self,
+        ctx: commands.Context,
+        count: int,
+        author: Union[discord.Member, Literal["bot"]],
+        dry: Optional[Literal["dry"]] = None
+    ):
+        if count <= 0 or count > MAX_LAST_COUNT:
+            return await ctx.send(f"⚠️ Count must be between 1 and {MAX_LAST_COUNT}.", delete_after=5)
+
+        author_id = self.bot.user.id if author == "bot" else author.id
+        message_ids = []
+        async for message in ctx.channel.history(limit=SCAN_LIMIT, before=ctx.message):
+            if message.author.id == author_id:
+                message_ids.append(message.id)
+                if len(message_ids) >= count:
+                    break
+        await self.run_bulk_delete(ctx, message_ids, dry is not None)
+
+    async def run_bulk_delete(self, ctx: commands.Context, message_ids: list, dry_run: bool):
+        """Bulk-delete recent IDs in batches of 100, then delete older ones one by one."""
+        try:
+            await ctx.message.delete()  # delete the command message itself
+        except discord.HTTPException:
+            pass
+
+        cutoff = discord.utils.utcnow() - BULK_MAX_AGE
+        recent = [mid for mid in message_ids if discord.utils.snowflake_time(mid) > cutoff]
+        old = [mid for mid in message_ids if discord.utils.snowflake_time(mid) <= cutoff]
+        total = len(recent) + len(old)
+
+        if dry_run or not total:
+            prefix = "🔎 Dry run:" if dry_run else "⚠️ Nothing to delete:"
+            return await ctx.send(
+                f"{prefix} {total} message(s) matched – {len(recent)} in bulk, {len(old)} one by one.",
+                delete_after=15
+            )
+
+        status = await ctx.send(f"🗑️ Deleting {total} message(s)…")
+        deleted = failed = 0
+
+        async def report(final: bool = False):
+            text = f"🗑️ Deleted {deleted}/{total} message(s)"
+            if failed:
+                text += f", {failed} failed or already gone"
+            text += "." if final else "…"
+            try:
+                await status.edit(content=text)
+            except discord.HTTPException:
+                pass
+
+        for i in range(0, len(recent), BULK_BATCH):
+            batch = recent[i:i + BULK_BATCH]
+            try:
+                await ctx.channel.delete_messages([discord.Object(id=mid) for mid in batch])
+                deleted += len(batch)
+            except discord.HTTPException as e:
+                print(f"[DELETE] Bulk delete of {len(batch)} messages failed: {e}")
+                failed += len(batch)
+            await report()
+
+        for i, mid in enumerate(old, start=1):
+            try:
+                await ctx.channel.get_partial_message(mid).delete()
+                deleted += 1
+            except discord.HTTPException:
+                failed += 1
+            if i % PROGRESS_EVERY == 0:
+                await report()
+            await asyncio.sleep(SEQUENTIAL_DELAY)
+
+        await report(final=True)
+        await status.delete(delay=10)
+
 async def setup(bot):
     await bot.add_cog(MessageManager(bot))
@@ -0,0 +1,108 @@
+import asyncio
+
+import discord
+from discord.ext import commands
+
+from .Metrics import metrics
+
+# Message classes. A message is a DM, a relay-channel message or some other
+# guild message; mentioning a watched target adds MSG_MENTIONS_TARGET.
+MSG_DM = "dm"
+MSG_RELAY = "relay"
+MSG_MENTIONS_TARGET = "mentions_target"
+MSG_OTHER = "other"
+MESSAGE_CLASSES = (MSG_DM, MSG_RELAY, MSG_MENTIONS_TARGET, MSG_OTHER)
+
+
+class MessageRouter:
+    """
+    The bot's single on_message listener for cogs that care about
+    particular kinds of message.
+
+    Each message is classified once using checks the owning cogs keep
+    precomputed (relay_check for relay channels; mention_targets and
+    mention_role_targets, the watched user and role IDs, matched against
+    the message's raw mentions). Only handlers subscribed to one of its
+    classes are run, each in its own task. Bot messages are never routed.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.handlers = {cls: {} for cls in MESSAGE_CLASSES}
+        self.relay_check = None
+        self.mention_targets = set()
+        self.mention_role_targets = set()
+
+    # ── subscriptions ────────────────────────────────────
+    def subscribe(self, message_class: str, name: str, handler):
+        """Run `handler(message)` for messages of this class; `name` labels its counters."""
+        self.handlers[message_class][name] = handler
+
+    def unsubscribe(self, name: str):
+        for handlers in self.handlers.values():
+            handlers.pop(name, None)
+
+    # ── classification ───────────────────────────────────
+    def classify(self, message: discord.Message) -> list:
+        if message.guild is None:
+            return [MSG_DM]
+
+        classes = []
+        if self.relay_check is not None and self.relay_check(message.channel):
+            classes.append(MSG_RELAY)
+        if (
+            (self.mention_targets and not self.mention_targets.isdisjoint(message.raw_mentions))
+            or (self.mention_role_targets and not self.mention_role_targets.isdisjoint(message.raw_role_mentions))
+        ):
+            classes.append(MSG_MENTIONS_TARGET)
+        return classes or [MSG_OTHER]
+
+    async def on_message(self, message: discord.Message):
+        if message.author.bot:
+            return
+        for message_class in self.classify(message):
+            metrics.incr(f"router.{message_class}")
+            for name, handler in self.handlers[message_class].items():
+                asyncio.create_task(self._run(name, handler, message))
+
+    async def _run(self, name: str, handler, message: discord.Message):
+        metrics.incr(f"router.handler.{name}.calls")
+        try:
+            with metrics.timer(f"router.handler.{name}"):
+                await handler(message)
+        except Exception as e:
+            metrics.incr(f"router.handler.{name}.errors")
+            print(f"[ROUTER] Handler {name} failed on message {message.id}: {type(e).__name__}: {e}")
+
+
+def get_router(bot) -> MessageRouter:
+    """The bot-wide router, created (and its listener added) on first use."""
+    router = getattr(bot, "message_router", None)
+    if router is None:
+        router = MessageRouter(bot)
+        bot.message_router = router
+        bot.add_listener(router.on_message, "on_message")
+    return router
+
+
+class MessageRouterCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(name="router", help="Shows message router subscriptions and counters.")
+    @commands.is_owner()
+    async def show_router(self, ctx):
+        router = get_router(self.bot)
+        lines = []
+        for message_class in MESSAGE_CLASSES:
+            count = metrics.counters.get(f"router.{message_class}", 0)
+            lines.append(f"{message_class}: {count} routed")
+            for name in router.handlers[message_class]:
+                calls = metrics.counters.get(f"router.handler.{name}.calls", 0)
+                errors = metrics.counters.get(f"router.handler.{name}.errors", 0)
+                lines.append(f"  {name}: {calls} calls, {errors} errors")
+        await ctx.send("**Message Router**\n```" + "\n".join(lines) + "```")
+
+
+async def setup(bot):
+    await bot.add_cog(MessageRouterCog(bot))
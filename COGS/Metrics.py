@@ -0,0 +1,88 @@
+import time
+from contextlib import contextmanager
+
+from discord.ext import commands
+
+
+# ===========================
+# In-process metrics
+# ===========================
+
+class Metrics:
+    """
+    Counters, gauges and timings kept in memory for the life of the bot.
+
+    Names are dotted strings ("backup_upload.retries"). Timings keep count,
+    total, max and last duration in seconds; nothing is persisted.
+    """
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.timings = {}
+        self.started = time.time()
+
+    def incr(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value):
+        self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        t = self.timings.get(name)
+        if t is None:
+            t = self.timings[name] = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+        t["count"] += 1
+        t["total"] += seconds
+        t["last"] = seconds
+        if seconds > t["max"]:
+            t["max"] = seconds
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def report(self, prefix: str = "") -> list:
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            if name.startswith(prefix):
+                lines.append(f"{name} = {value}")
+        for name, value in sorted(self.gauges.items()):
+            if name.startswith(prefix):
+                lines.append(f"{name} = {value}")
+        for name, t in sorted(self.timings.items()):
+            if name.startswith(prefix):
+                avg = t["total"] / t["count"] if t["count"] else 0.0
+                lines.append(
+                    f"{name}: n={t['count']} avg={avg * 1000:.1f}ms "
+                    f"max={t['max'] * 1000:.1f}ms last={t['last'] * 1000:.1f}ms"
+                )
+        return lines
+
+
+metrics = Metrics()
+
+
+class MetricsCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.command(name="metrics", help="Shows in-process metrics, optionally filtered by prefix.")
+    @commands.is_owner()
+    async def show_metrics(self, ctx, prefix: str = ""):
+        lines = metrics.report(prefix)
+        if not lines:
+            return await ctx.send("No metrics recorded yet.", delete_after=10)
+        uptime_h = (time.time() - metrics.started) / 3600
+        body = "\n".join(lines)
+        if len(body) > 1800:
+            body = body[:1800] + "\n…"
+        await ctx.send(f"**Metrics** (uptime {uptime_h:.1f}h)\n```{body}```")
+
+
+async def setup(bot):
+    await bot.add_cog(MetricsCog(bot))
@@ -1,13 +1,45 @@
 import discord
 from discord.ext import commands
+import asyncio
 import json
+import sqlite3
+import threading
+import time
+from collections import Counter, deque
+from datetime import timedelta
 from pathlib import Path
 
+from apscheduler.triggers.cron import CronTrigger
+
+from .Metrics import metrics
+from .Scheduler import MISFIRE_RUN_ONCE, get_scheduler
+
 BASE_DIR = Path(__file__).resolve().parent          # /COGS
 ROOT_DIR = BASE_DIR.parent                          # /CDA Pay
 JSON_DIR = ROOT_DIR / "JSON"                        # /CDA Pay/JSON
 JSON_DIR.mkdir(exist_ok=True)
 SERVER_CONFIG_PATH = JSON_DIR / "server.json"
+AUDIT_DIR = ROOT_DIR / "AUDIT"                      # /CDA Pay/AUDIT
+AUDIT_DIR.mkdir(exist_ok=True)
+AUDIT_DB_PATH = AUDIT_DIR / "audit.sqlite3"
+
+# Audit-log correlation
+AUDIT_BATCH_DELAY = 1.0     # seconds to gather gateway events before one audit_logs call
+AUDIT_WINDOW = 30           # seconds an audit entry stays cached
+AUDIT_CACHE_MAX = 500       # entries cached per guild
+AUDIT_MATCH_AGE = 15        # an entry only explains an event if it is this recent
+
+# Audit channel sink
+SINK_QUEUE_MAX = 200        # records waiting to be sent before new ones are dropped
+SINK_FLUSH_WINDOW = 2.0     # seconds to gather embeds into one message
+SINK_BATCH_MAX = 10         # Discord's embeds-per-message limit
+SINK_CHARS_MAX = 6000       # Discord's total embed characters per message
+
+# Budget for the synchronous capture done inside event listeners
+CAPTURE_BUDGET = 0.001      # seconds
+
+# Local audit trail
+TRAIL_FLUSH_INTERVAL = 2.0  # seconds between batched inserts
 
 
 def load_server_config():
@@ -30,6 +62,9 @@ def load_server_config():
         },
         "users": {
             "target_user": 0
+        },
+        "audit": {
+            "retention_days": 90
         }
     }
 
@@ -50,166 +85,561 @@ def load_server_config():
         cfg_time.update(data.get("time", {}))
         cfg_users = cfg.get("users", {}).copy()
         cfg_users.update(data.get("users", {}))
+        cfg_audit = cfg["audit"].copy()
+        cfg_audit.update(data.get("audit", {}))
         cfg["channels"] = cfg_channels
         cfg["roles"] = cfg_roles
         cfg["time"] = cfg_time
         cfg["users"] = cfg_users
+        cfg["audit"] = cfg_audit
         return cfg
     except Exception:
         return default_config
 
 
 
+class AuditLogCorrelator:
+    """
+    Matches gateway events to the bot's own audit-log entries.
+
+    Instead of one audit_logs request per event, events that miss the cache
+    ask for a refresh; every request within AUDIT_BATCH_DELAY shares a
+    single fetch of the bot's new entries since the last one. Entries are
+    cached by target ID for AUDIT_WINDOW seconds, so a bulk role change
+    costs one API call rather than one per member.
+    """
+
+    def __init__(self):
+        self._entries = {}        # guild_id -> deque[AuditLogEntry], oldest first
+        self._by_target = {}      # guild_id -> {target_id: deque[AuditLogEntry]}
+        self._last_id = {}        # guild_id -> newest entry ID seen
+        self._pending = {}        # guild_id -> Future for the scheduled fetch
+
+    def _evict(self, guild_id: int):
+        entries = self._entries.get(guild_id)
+        if not entries:
+            return
+        by_target = self._by_target[guild_id]
+        cutoff = discord.utils.utcnow() - timedelta(seconds=AUDIT_WINDOW)
+        while entries and (entries[0].created_at < cutoff or len(entries) > AUDIT_CACHE_MAX):
+            old = entries.popleft()
+            target_id = getattr(old.target, "id", None)
+            bucket = by_target.get(target_id)
+            if bucket:
+                bucket.popleft()
+                if not bucket:
+                    del by_target[target_id]
+
+    def _lookup(self, guild_id: int, target_id: int, actions):
+        bucket = self._by_target.get(guild_id, {}).get(target_id)
+        if not bucket:
+            return None
+        cutoff = discord.utils.utcnow() - timedelta(seconds=AUDIT_MATCH_AGE)
+        for entry in reversed(bucket):
+            if entry.created_at < cutoff:
+                break
+            if entry.action in actions:
+                return entry
+        return None
+
+    async def find(self, guild: discord.Guild, target_id: int, actions):
+        """The bot's most recent matching entry for target_id, fetching at most once."""
+        entry = self._lookup(guild.id, target_id, actions)
+        if entry is not None:
+            metrics.incr("audit_log.cache_hits")
+            return entry
+        await self.refresh(guild)
+        return self._lookup(guild.id, target_id, actions)
+
+    async def refresh(self, guild: discord.Guild):
+        future = self._pending.get(guild.id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[guild.id] = future
+            asyncio.create_task(self._fetch_later(guild, future))
+        await asyncio.shield(future)
+
+    async def _fetch_later(self, guild: discord.Guild, future: asyncio.Future):
+        try:
+            await asyncio.sleep(AUDIT_BATCH_DELAY)
+            # Events arriving from here on wait for the next fetch
+            self._pending.pop(guild.id, None)
+            await self._fetch(guild)
+        except Exception as e:
+            print(f"[AUDIT] Audit log fetch failed for {guild.id}: {e}")
+        finally:
+            if self._pending.get(guild.id) is future:
+                del self._pending[guild.id]
+            if not future.done():
+                future.set_result(None)
+
+    async def _fetch(self, guild: discord.Guild):
+        if guild.me is None:
+            return
+        last_id = self._last_id.get(guild.id)
+        after = discord.Object(id=last_id) if last_id else discord.utils.utcnow() - timedelta(seconds=AUDIT_WINDOW)
+        metrics.incr("audit_log.fetches")
+
+        entries = self._entries.setdefault(guild.id, deque())
+        by_target = self._by_target.setdefault(guild.id, {})
+        async for entry in guild.audit_logs(limit=100, user=guild.me, after=after):
+            if last_id and entry.id <= last_id:
+                continue
+            entries.append(entry)
+            by_target.setdefault(getattr(entry.target, "id", None), deque()).append(entry)
+            self._last_id[guild.id] = max(self._last_id.get(guild.id, 0), entry.id)
+        self._evict(guild.id)
+
+
+def format_options(opts) -> list:
+    out = []
+    for opt in opts:
+        if "options" in opt:
+            out.append(f"{opt['name']}=[{', '.join(format_options(opt['options']))}]")
+        else:
+            out.append(f"{opt['name']}={opt.get('value')!r}")
+    return out
+
+
+def render_audit_embeds(record: dict) -> list:
+    """Turn one captured audit record into the embed(s) posted for it."""
+    kind = record["kind"]
+    user = f"<@{record['user_id']}>"
+    embeds = []
+
+    if kind in ("command", "command_error"):
+        arg_string = ""
+        if record.get("args"):
+            arg_string += f"Args: {', '.join(record['args'])}\n"
+        if record.get("kwargs"):
+            arg_string += f"Kwargs: {', '.join(f'{k}={v}' for k, v in record['kwargs'].items())}\n"
+        if not arg_string:
+            arg_string = "No arguments"
+        description = (
+            f"**User:** {user}\n"
+            f"**Command:** `{record['command']}`\n"
+            f"**Channel:** <#{record['channel_id']}>\n"
+            f"**Arguments:**\n```{arg_string}```"
+        )
+        if kind == "command":
+            embeds.append(discord.Embed(title="Command Used", description=description,
+                                        color=discord.Color.teal()))
+        else:
+            embeds.append(discord.Embed(title="Command Error (Bot)",
+                                        description=description + f"\n**Error:** `{record['error']}`",
+                                        color=discord.Color.orange()))
+
+    elif kind in ("slash_command", "slash_command_error"):
+        options = format_options(record.get("options") or [])
+        arg_string = ", ".join(options) if options else "No arguments"
+        description = (
+            f"**User:** {user}\n"
+            f"**Command:** `/{record['command']}`\n"
+            f"**Channel:** <#{record['channel_id']}>\n"
+            f"**Arguments:**\n```{arg_string}```"
+        )
+        if kind == "slash_command":
+            embeds.append(discord.Embed(title="Slash Command Used", description=description,
+                                        color=discord.Color.teal()))
+        else:
+            embeds.append(discord.Embed(title="Slash Command Error (Bot)",
+                                        description=description + f"\n**Error:** `{record['error']}`",
+                                        color=discord.Color.orange()))
+
+    elif kind == "nick_change":
+        embeds.append(discord.Embed(
+            title="Nickname Changed (by Bot)",
+            description=f"**User:** {user}\n**Before:** `{record['before']}`\n**After:** `{record['after']}`",
+            color=discord.Color.blue()
+        ))
+
+    elif kind == "role_change":
+        if record.get("added"):
+            embeds.append(discord.Embed(
+                title="Role Added (by Bot)",
+                description=f"**User:** {user}\n" + "\n".join(f"Added: {name}" for name in record["added"]),
+                color=discord.Color.green()
+            ))
+        if record.get("removed"):
+            embeds.append(discord.Embed(
+                title="Role Removed (by Bot)",
+                description=f"**User:** {user}\n" + "\n".join(f"Removed: {name}" for name in record["removed"]),
+                color=discord.Color.red()
+            ))
+
+    for embed in embeds:
+        embed.set_footer(text=f"User ID: {record['user_id']}")
+    return embeds
+
+
+class AuditSink:
+    """
+    Turns audit records into as few messages as possible.
+
+    submit() only enqueues a compact record, so it is safe to call from
+    the hot path of any listener. A single low-priority consumer renders
+    the records into embeds (yielding to the loop between each), gathers
+    whatever arrives within SINK_FLUSH_WINDOW (up to 10 embeds / 6000
+    characters) and sends them as one message. When the queue is full new
+    records are dropped and counted by kind; the counts go out as one
+    summary embed with the next batch.
+    """
+
+    def __init__(self, bot, channel_id: int, render):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.render = render
+        self._queue = asyncio.Queue(maxsize=SINK_QUEUE_MAX)
+        self._ready = deque()
+        self._dropped = Counter()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    def submit(self, record: dict) -> bool:
+        if not self.channel_id:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except asyncio.QueueFull:
+            self._dropped[record["kind"]] += 1
+            metrics.incr("audit_sink.dropped")
+            return False
+
+    def _drop_summary(self):
+        if not self._dropped:
+            return None
+        lines = [f"{count} × {kind}" for kind, count in self._dropped.most_common(10)]
+        self._dropped.clear()
+        return discord.Embed(
+            title="Audit Events Dropped",
+            description="The audit queue was full; these events were not posted:\n" + "\n".join(lines),
+            color=discord.Color.dark_grey()
+        )
+
+    def _render_into_ready(self, record: dict):
+        try:
+            self._ready.extend(self.render(record))
+        except Exception as e:
+            print(f"[AUDIT] Could not render {record.get('kind')} record: {e}")
+
+    async def _next_batch(self) -> list:
+        loop = asyncio.get_running_loop()
+        if not self._ready:
+            self._render_into_ready(await self._queue.get())
+        deadline = loop.time() + SINK_FLUSH_WINDOW
+
+        batch, chars = [], 0
+        summary = self._drop_summary()
+        if summary is not None:
+            batch.append(summary)
+            chars += len(summary)
+
+        while len(batch) < SINK_BATCH_MAX:
+            if not self._ready:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                self._render_into_ready(record)
+                # Low priority: let interaction handlers run between renders
+                await asyncio.sleep(0)
+                continue
+            embed = self._ready[0]
+            if batch and chars + len(embed) > SINK_CHARS_MAX:
+                break
+            batch.append(self._ready.popleft())
+            chars += len(embed)
+        return batch
+
+    async def _run(self):
+        await self.bot.wait_until_ready()
+        while True:
+            batch = await self._next_batch()
+            channel = self.bot.get_channel(self.channel_id) if self.channel_id else None
+            if not batch or channel is None:
+                continue
+            start = time.perf_counter()
+            try:
+                await channel.send(embeds=batch)
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    print(f"[AUDIT] Failed to send audit batch: {e}")
+                    continue
+                await asyncio.sleep(getattr(e, "retry_after", None) or 5)
+                try:
+                    await channel.send(embeds=batch)
+                except discord.HTTPException as e:
+                    print(f"[AUDIT] Failed to send audit batch after retry: {e}")
+                    continue
+            metrics.observe("audit_sink.send", time.perf_counter() - start)
+            metrics.incr("audit_sink.messages")
+            metrics.incr("audit_sink.embeds", len(batch))
+
+
+class AuditTrail:
+    """
+    Every audit record, kept locally in SQLite.
+
+    add() just buffers the record; a background task inserts the buffer in
+    one transaction every TRAIL_FLUSH_INTERVAL seconds on a worker thread.
+    Rows are indexed by (user_id, ts), (command, ts) and ts, so queries by
+    user, command or time range stay fast. prune() drops rows past the
+    retention period.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._task = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS audit_events ("
+                " id INTEGER PRIMARY KEY,"
+                " ts REAL NOT NULL,"
+                " kind TEXT NOT NULL,"
+                " user_id INTEGER,"
+                " command TEXT,"
+                " channel_id INTEGER,"
+                " data TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_user_ts ON audit_events(user_id, ts)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_command_ts ON audit_events(command, ts)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_ts ON audit_events(ts)")
+            self._conn.commit()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        await self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def add(self, record: dict):
+        self._buffer.append(record)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(TRAIL_FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[AUDIT] Failed to write audit trail: {e}")
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, []
+        await asyncio.to_thread(self._insert, rows)
+
+    def _insert(self, records: list):
+        rows = [
+            (r["ts"], r["kind"], r.get("user_id"), r.get("command"), r.get("channel_id"),
+             json.dumps(r, default=str))
+            for r in records
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO audit_events (ts, kind, user_id, command, channel_id, data) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def query(self, user_id: int = None, command: str = None, since: float = None, limit: int = 20) -> list:
+        """Newest-first records matching every given filter. Blocking."""
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if command is not None:
+            clauses.append("command = ?")
+            params.append(command)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT data FROM audit_events {where} ORDER BY ts DESC LIMIT ?", params
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def prune(self, retention_days: int) -> int:
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM audit_events WHERE ts < ?", (cutoff,)).rowcount
+            self._conn.commit()
+        return deleted
+
+
+def summarise_record(record: dict) -> str:
+    """One line describing an audit record, for /admin audit."""
+    kind = record["kind"]
+    if kind in ("command", "command_error"):
+        detail = f"`!{record.get('command')}` {' '.join(record.get('args') or [])}"
+    elif kind in ("slash_command", "slash_command_error"):
+        detail = f"`/{record.get('command')}` {', '.join(format_options(record.get('options') or []))}"
+    elif kind == "nick_change":
+        detail = f"nick `{record.get('before')}` → `{record.get('after')}`"
+    elif kind == "role_change":
+        detail = f"+{record.get('added')} -{record.get('removed')}"
+    elif kind == "pay_record_edit":
+        before, after = record.get("before") or {}, record.get("after") or {}
+        changed = [f"{k}: {before.get(k)} → {after.get(k)}" for k in after if before.get(k) != after.get(k)]
+        detail = f"record `{record.get('record_id')}` " + ("; ".join(changed) or "no changes")
+    elif kind == "pay_record_delete":
+        deleted = record.get("record") or {}
+        detail = f"record `{record.get('record_id')}` ({deleted.get('pay_date')} {deleted.get('pay_time')}) deleted"
+    else:
+        detail = ""
+    if record.get("error"):
+        detail += f" – error: {record['error']}"
+    return f"<t:{int(record['ts'])}:f> **{kind}** <@{record.get('user_id')}> {detail}".strip()
+
+
 class BotAuditCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-
-    async def send_audit_log(self, embed: discord.Embed):
+        self.audit_entries = AuditLogCorrelator()
         cfg = load_server_config()
-        audit_id = cfg.get("channels", {}).get("audit_log")
-        channel = self.bot.get_channel(audit_id) if audit_id else None
-        if channel:
-            await channel.send(embed=embed)
+        self.sink = AuditSink(bot, cfg.get("channels", {}).get("audit_log"), render_audit_embeds)
+        self.trail = AuditTrail(AUDIT_DB_PATH)
+
+    async def cog_load(self):
+        self.sink.start()
+        self.trail.start()
+        get_scheduler(self.bot).add_job(
+            "audit_trail_prune",
+            self.prune_audit_trail,
+            CronTrigger(hour=4, minute=30),
+            misfire=MISFIRE_RUN_ONCE,
+        )
+
+    async def cog_unload(self):
+        get_scheduler(self.bot).remove_job("audit_trail_prune")
+        self.sink.stop()
+        await self.trail.stop()
+
+    async def prune_audit_trail(self):
+        retention_days = int(load_server_config()["audit"].get("retention_days", 90))
+        deleted = await asyncio.to_thread(self.trail.prune, retention_days)
+        if deleted:
+            print(f"[AUDIT] Pruned {deleted} audit trail rows older than {retention_days} days.")
+
+    async def query_audit_trail(self, **filters) -> list:
+        await self.trail.flush()
+        with metrics.timer("audit_trail.query"):
+            return await asyncio.to_thread(self.trail.query, **filters)
+
+    @commands.Cog.listener()
+    async def on_config_reload(self):
+        self.sink.channel_id = load_server_config().get("channels", {}).get("audit_log")
+
+    def record_event(self, kind: str, user_id: int, **fields):
+        """Capture an audit event. Cheap and synchronous; rendering happens later."""
+        record = {"ts": time.time(), "kind": kind, "user_id": user_id}
+        record.update(fields)
+        self.trail.add(record)
+        self.sink.submit(record)
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
         if after.guild.me is None:
             return
-        async for entry in after.guild.audit_logs(limit=3, user=after.guild.me, action=discord.AuditLogAction.member_update):
-            if entry.target.id == after.id and (discord.utils.utcnow() - entry.created_at).total_seconds() < 15:
-                if before.nick != after.nick:
-                    embed = discord.Embed(
-                        title="Nickname Changed (by Bot)",
-                        description=f"**User:** {after.mention}\n**Before:** `{before.nick}`\n**After:** `{after.nick}`",
-                        color=discord.Color.blue()
-                    )
-                    embed.set_footer(text=f"User ID: {after.id}")
-                    await self.send_audit_log(embed)
-                if before.roles != after.roles:
-                    before_roles = set(before.roles)
-                    after_roles = set(after.roles)
-                    added = after_roles - before_roles
-                    removed = before_roles - after_roles
-                    if added:
-                        embed = discord.Embed(
-                            title="Role Added (by Bot)",
-                            description=f"**User:** {after.mention}\n" +
-                                        "\n".join(f"Added: {role.name}" for role in added),
-                            color=discord.Color.green()
-                        )
-                        embed.set_footer(text=f"User ID: {after.id}")
-                        await self.send_audit_log(embed)
-                    if removed:
-                        embed = discord.Embed(
-                            title="Role Removed (by Bot)",
-                            description=f"**User:** {after.mention}\n" +
-                                        "\n".join(f"Removed: {role.name}" for role in removed),
-                            color=discord.Color.red()
-                        )
-                        embed.set_footer(text=f"User ID: {after.id}")
-                        await self.send_audit_log(embed)
-                break
+        if before.nick == after.nick and before.roles == after.roles:
+            return
+        entry = await self.audit_entries.find(
+            after.guild, after.id,
+            (discord.AuditLogAction.member_update, discord.AuditLogAction.member_role_update)
+        )
+        if entry is None:
+            return
+
+        if before.nick != after.nick:
+            self.record_event("nick_change", after.id, before=before.nick, after=after.nick)
+        if before.roles != after.roles:
+            before_roles = set(before.roles)
+            after_roles = set(after.roles)
+            added = after_roles - before_roles
+            removed = before_roles - after_roles
+            if added or removed:
+                self.record_event(
+                    "role_change", after.id,
+                    added=[role.name for role in added],
+                    removed=[role.name for role in removed]
+                )
+
+    def _command_fields(self, ctx) -> dict:
+        return {
+            "command": str(ctx.command),
+            "channel_id": ctx.channel.id,
+            "args": [repr(a) for a in ctx.args[2:]] if len(ctx.args) > 2 else [],
+            "kwargs": {k: repr(v) for k, v in getattr(ctx, "kwargs", {}).items()},
+        }
 
     @commands.Cog.listener()
     async def on_command(self, ctx):
-        args = ', '.join(repr(a) for a in ctx.args[2:]) if len(ctx.args) > 2 else ""
-        kwargs = ', '.join(f"{k}={v!r}" for k, v in getattr(ctx, 'kwargs', {}).items()) if hasattr(ctx, 'kwargs') else ""
-        arg_string = ""
-        if args:
-            arg_string += f"Args: {args}\n"
-        if kwargs:
-            arg_string += f"Kwargs: {kwargs}\n"
-        if not arg_string:
-            arg_string = "No arguments"
-
-        embed = discord.Embed(
-            title="Command Used",
-            description=f"**User:** {ctx.author.mention}\n"
-                        f"**Command:** `{ctx.command}`\n"
-                        f"**Channel:** {ctx.channel.mention}\n"
-                        f"**Arguments:**\n```{arg_string}```",
-            color=discord.Color.teal()
-        )
-        embed.set_footer(text=f"User ID: {ctx.author.id}")
-        await self.send_audit_log(embed)
+        self.record_event("command", ctx.author.id, **self._command_fields(ctx))
 
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
-        args = ', '.join(repr(a) for a in ctx.args[2:]) if len(ctx.args) > 2 else ""
-        kwargs = ', '.join(f"{k}={v!r}" for k, v in getattr(ctx, 'kwargs', {}).items()) if hasattr(ctx, 'kwargs') else ""
-        arg_string = ""
-        if args:
-            arg_string += f"Args: {args}\n"
-        if kwargs:
-            arg_string += f"Kwargs: {kwargs}\n"
-        if not arg_string:
-            arg_string = "No arguments"
-
-        embed = discord.Embed(
-            title="Command Error (Bot)",
-            description=f"**User:** {ctx.author.mention}\n"
-                        f"**Command:** `{ctx.command}`\n"
-                        f"**Channel:** {ctx.channel.mention}\n"
-                        f"**Arguments:**\n```{arg_string}```\n"
-                        f"**Error:** `{error}`",
-            color=discord.Color.orange()
-        )
-        embed.set_footer(text=f"User ID: {ctx.author.id}")
-        await self.send_audit_log(embed)
+        self.record_event("command_error", ctx.author.id, error=str(error), **self._command_fields(ctx))
 
     @commands.Cog.listener()
     async def on_interaction(self, interaction: discord.Interaction):
-        if interaction.type is discord.InteractionType.application_command and interaction.command is not None:
-            options = []
-            if interaction.data and "options" in interaction.data:
-                def recurse_options(opts):
-                    out = []
-                    for opt in opts:
-                        if "options" in opt:
-                            out.append(f"{opt['name']}=[{', '.join(recurse_options(opt['options']))}]")
-                        else:
-                            out.append(f"{opt['name']}={opt.get('value')!r}")
-                    return out
-                options = recurse_options(interaction.data["options"])
-            arg_string = ", ".join(options) if options else "No arguments"
-
-            embed = discord.Embed(
-                title="Slash Command Used",
-                description=f"**User:** {interaction.user.mention}\n"
-                            f"**Command:** `/{interaction.command.name}`\n"
-                            f"**Channel:** <#{interaction.channel_id}>\n"
-                            f"**Arguments:**\n```{arg_string}```",
-                color=discord.Color.teal()
-            )
-            embed.set_footer(text=f"User ID: {interaction.user.id}")
-            await self.send_audit_log(embed)
+        if interaction.type is not discord.InteractionType.application_command or interaction.command is None:
+            return
+        start = time.perf_counter()
+        self.record_event(
+            "slash_command", interaction.user.id,
+            command=interaction.command.name,
+            channel_id=interaction.channel_id,
+            options=(interaction.data or {}).get("options", []),
+        )
+        elapsed = time.perf_counter() - start
+        metrics.observe("audit.capture", elapsed)
+        if elapsed > CAPTURE_BUDGET:
+            metrics.incr("audit.capture_over_budget")
 
     @commands.Cog.listener()
     async def on_app_command_error(self, interaction: discord.Interaction, error):
-        options = []
-        if interaction.data and "options" in interaction.data:
-            def recurse_options(opts):
-                out = []
-                for opt in opts:
-                    if "options" in opt:
-                        out.append(f"{opt['name']}=[{', '.join(recurse_options(opt['options']))}]")
-                    else:
-                        out.append(f"{opt['name']}={opt.get('value')!r}")
-                return out
-            options = recurse_options(interaction.data["options"])
-        arg_string = ", ".join(options) if options else "No arguments"
+        self.record_event(
+            "slash_command_error", interaction.user.id,
+            command=interaction.command.name if interaction.command else "unknown",
+            channel_id=interaction.channel_id,
+            options=(interaction.data or {}).get("options", []),
+            error=str(error),
+        )
 
-        embed = discord.Embed(
-            title="Slash Command Error (Bot)",
-            description=f"**User:** {interaction.user.mention}\n"
-                        f"**Command:** `/{interaction.command.name}`\n"
-                        f"**Channel:** <#{interaction.channel_id}>\n"
-                        f"**Arguments:**\n```{arg_string}```\n"
-                        f"**Error:** `{error}`",
-            color=discord.Color.orange()
+    @commands.Cog.listener()
+    async def on_pay_record_edit(self, user_id: int, record_id: str, before: dict, after: dict):
+        self.record_event(
+            "pay_record_edit", user_id,
+            command="editpay", record_id=record_id, before=before, after=after
+        )
+
+    @commands.Cog.listener()
+    async def on_pay_record_delete(self, user_id: int, record_id: str, record: dict):
+        self.record_event(
+            "pay_record_delete", user_id,
+            command="deletepay", record_id=record_id, record=record
         )
-        embed.set_footer(text=f"User ID: {interaction.user.id}")
-        await self.send_audit_log(embed)
 
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
@@ -217,12 +647,9 @@ class BotAuditCog(commands.Cog):
         target_user_id = cfg.get("users", {}).get("target_user")
         if not target_user_id or user.id != target_user_id:
             return
-        async for entry in guild.audit_logs(limit=3, action=discord.AuditLogAction.ban):
-            if (entry.target.id == target_user_id and
-                entry.user.id == guild.me.id and
-                (discord.utils.utcnow() - entry.created_at).total_seconds() < 15):
-                await guild.leave()
-                break
+        entry = await self.audit_entries.find(guild, target_user_id, (discord.AuditLogAction.ban,))
+        if entry is not None:
+            await guild.leave()
 
     @commands.Cog.listener()
     async def on_member_remove(self, member):
@@ -230,12 +657,9 @@ class BotAuditCog(commands.Cog):
         target_user_id = cfg.get("users", {}).get("target_user")
         if not target_user_id or member.id != target_user_id:
             return
-        async for entry in member.guild.audit_logs(limit=3, action=discord.AuditLogAction.kick):
-            if (entry.target.id == target_user_id and
-                entry.user.id == member.guild.me.id and
-                (discord.utils.utcnow() - entry.created_at).total_seconds() < 15):
-                await member.guild.leave()
-                break
+        entry = await self.audit_entries.find(member.guild, target_user_id, (discord.AuditLogAction.kick,))
+        if entry is not None:
+            await member.guild.leave()
 
 async def setup(bot):
     await bot.add_cog(BotAuditCog(bot))
@@ -1,14 +1,24 @@
 import discord
 from discord.ext import commands
+import asyncio
 import json
 from pathlib import Path
 
+from .MessageRouter import MSG_MENTIONS_TARGET, get_router
+from .Metrics import metrics
+
 BASE_DIR = Path(__file__).resolve().parent          # /COGS
 ROOT_DIR = BASE_DIR.parent                          # /CDA Pay
 JSON_DIR = ROOT_DIR / "JSON"                        # /CDA Pay/JSON
 JSON_DIR.mkdir(exist_ok=True)
 SERVER_CONFIG_PATH = JSON_DIR / "server.json"
 
+# Digest limits (Discord allows 10 embeds / 6000 embed characters per message)
+DIGEST_MAX_HITS = 50
+EMBEDS_PER_MESSAGE = 10
+EMBED_CHARS_PER_MESSAGE = 6000
+SNIPPET_CHARS = 1000
+
 
 def load_server_config():
     default_config = {
@@ -32,6 +42,11 @@ def load_server_config():
         },
         "users": {
             "target_user": 0
+        },
+        "mentions": {
+            "users": [],
+            "roles": [],
+            "digest_seconds": 30
         }
     }
 
@@ -58,10 +73,14 @@ def load_server_config():
         cfg_users = cfg["users"].copy()
         cfg_users.update(data.get("users", {}))
 
+        cfg_mentions = cfg["mentions"].copy()
+        cfg_mentions.update(data.get("mentions", {}))
+
         cfg["channels"] = cfg_channels
         cfg["roles"] = cfg_roles
         cfg["time"] = cfg_time
         cfg["users"] = cfg_users
+        cfg["mentions"] = cfg_mentions
 
         return cfg
     except Exception:
@@ -70,42 +89,153 @@ def load_server_config():
 
 
 class MentionLogger(commands.Cog):
+    """
+    Logs mentions of watched users and roles to the mention log channel.
+
+    Watched IDs are users.target_user plus mentions.users / mentions.roles.
+    Hits are collected and sent as one digest every
+    mentions.digest_seconds, each watched target pinged at most once
+    per digest.
+    """
+
     def __init__(self, bot):
         self.bot = bot
+        self.watch_users = set()
+        self.watch_roles = set()
+        self.log_channel_id = 0
+        self.digest_seconds = 30
+
+        # Digest state: (embed, users hit, roles hit) per mention
+        self.pending = []
+        self.dropped = 0
+        self._digest_task = None
+
+    async def cog_load(self):
+        self.apply_config()
+        get_router(self.bot).subscribe(MSG_MENTIONS_TARGET, "mention_logger", self.handle_mention)
+
+    async def cog_unload(self):
+        router = get_router(self.bot)
+        router.unsubscribe("mention_logger")
+        router.mention_targets = set()
+        router.mention_role_targets = set()
+        if self._digest_task is not None:
+            self._digest_task.cancel()
+            self._digest_task = None
+        await self.send_digest()
+
+    def apply_config(self):
+        """Read the watch list once; the router matches mentions against the same sets."""
+        cfg = load_server_config()
+        mcfg = cfg.get("mentions", {})
+        self.log_channel_id = cfg.get("channels", {}).get("mention_log")
+        self.digest_seconds = float(mcfg.get("digest_seconds", 30))
+
+        users = {int(user_id) for user_id in mcfg.get("users", [])}
+        target_user_id = cfg.get("users", {}).get("target_user")
+        if target_user_id:
+            users.add(int(target_user_id))
+        roles = {int(role_id) for role_id in mcfg.get("roles", [])}
+
+        if not self.log_channel_id:
+            users, roles = set(), set()
+        self.watch_users = users
+        self.watch_roles = roles
+
+        router = get_router(self.bot)
+        router.mention_targets = self.watch_users
+        router.mention_role_targets = self.watch_roles
 
     @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
+    async def on_config_reload(self):
+        self.apply_config()
+
+    # ── hits ─────────────────────────────────────────────
+    async def handle_mention(self, message: discord.Message):
+        users = self.watch_users.intersection(message.raw_mentions)
+        roles = self.watch_roles.intersection(message.raw_role_mentions)
+        if not users and not roles:
             return
 
-        cfg = load_server_config()
-        target_user_id = cfg.get("users", {}).get("target_user")
-        log_channel_id = cfg.get("channels", {}).get("mention_log")
+        metrics.incr("mentions.hits")
+        if len(self.pending) >= DIGEST_MAX_HITS:
+            self.dropped += 1
+            metrics.incr("mentions.dropped")
+            return
 
-        if not target_user_id or not log_channel_id:
+        self.pending.append((self.build_embed(message, users, roles), users, roles))
+        if self._digest_task is None:
+            self._digest_task = asyncio.create_task(self._send_digest_later())
+
+    def build_embed(self, message: discord.Message, users: set, roles: set) -> discord.Embed:
+        mentioned = [f"<@{user_id}>" for user_id in sorted(users)] + [f"<@&{role_id}>" for role_id in sorted(roles)]
+        content = message.content
+        if len(content) > SNIPPET_CHARS:
+            content = content[:SNIPPET_CHARS] + "…"
+
+        message_link = f"https://discord.com/channels/{message.guild.id}/{message.channel.id}/{message.id}"
+        log_embed = discord.Embed(
+            title="Target User Mentioned",
+            description=(
+                f"**Author:** {message.author.mention}\n"
+                f"**Channel:** {message.channel.mention}\n"
+                f"**Mentioned:** {', '.join(mentioned)}\n\n"
+                f"**Message:**\n{content}\n\n"
+                f"-# [Jump to Message]({message_link})"
+            ),
+            color=discord.Color.orange(),
+            timestamp=message.created_at
+        )
+        log_embed.set_footer(text=f"Message ID: {message.id}")
+        return log_embed
+
+    # ── digest ───────────────────────────────────────────
+    async def _send_digest_later(self):
+        await asyncio.sleep(self.digest_seconds)
+        self._digest_task = None
+        try:
+            await self.send_digest()
+        except Exception as e:
+            print(f"[MENTIONS] Failed to send digest: {e}")
+
+    async def send_digest(self):
+        hits, self.pending = self.pending, []
+        dropped, self.dropped = self.dropped, 0
+        if not hits:
             return
+        log_channel = self.bot.get_channel(self.log_channel_id)
+        if not log_channel:
+            return
+
+        users = set().union(*(hit[1] for hit in hits))
+        roles = set().union(*(hit[2] for hit in hits))
+        pings = " ".join(
+            [f"<@{user_id}>" for user_id in sorted(users)] + [f"<@&{role_id}>" for role_id in sorted(roles)]
+        )
+        if dropped:
+            pings += f"\n-# {dropped} more mention(s) not shown."
+        ping_mentions = discord.AllowedMentions(
+            everyone=False,
+            users=[discord.Object(id=user_id) for user_id in users],
+            roles=[discord.Object(id=role_id) for role_id in roles]
+        )
+
+        batches = [[]]
+        size = 0
+        for embed, _, _ in hits:
+            if len(batches[-1]) >= EMBEDS_PER_MESSAGE or size + len(embed) > EMBED_CHARS_PER_MESSAGE:
+                batches.append([])
+                size = 0
+            batches[-1].append(embed)
+            size += len(embed)
+
+        for i, batch in enumerate(batches):
+            if i == 0:
+                await log_channel.send(content=pings, embeds=batch, allowed_mentions=ping_mentions)
+            else:
+                await log_channel.send(embeds=batch, allowed_mentions=discord.AllowedMentions.none())
+        metrics.incr("mentions.digests")
 
-        # Check if the target user is mentioned
-        if any(user.id == target_user_id for user in message.mentions):
-            log_channel = self.bot.get_channel(log_channel_id)
-            if not log_channel:
-                return
-
-            message_link = f"https://discord.com/channels/{message.guild.id}/{message.channel.id}/{message.id}"
-            target_user_mention = f"<@{target_user_id}>"
-            log_embed = discord.Embed(
-                title="Target User Mentioned",
-                description=(
-                    f"**Author:** {message.author.mention}\n"
-                    f"**Channel:** {message.channel.mention}\n\n"
-                    f"**Message:**\n{message.content}\n\n"
-                    f"-# [Jump to Message]({message_link})"
-                ),
-                color=discord.Color.orange()
-            )
-            log_embed.set_footer(text=f"Message ID: {message.id}")
-            await log_channel.send(target_user_mention)
-            await log_channel.send(embed=log_embed)
 
 async def setup(bot):
     await bot.add_cog(MentionLogger(bot))
@@ -1,12 +1,23 @@
 import discord
-from discord.ext import commands, tasks
-import aiofiles
+from discord.ext import commands
+import asyncio
+import gzip
+import hashlib
+import io
 import os
+import re
+import tarfile
+import threading
+import time
 from datetime import datetime, timedelta
-import asyncio
 import json
 from pathlib import Path
-from zoneinfo import ZoneInfo
+from apscheduler.triggers.cron import CronTrigger
+
+from .Metrics import metrics
+from .Permissions import has_roles, role_cache
+from .Scheduler import MISFIRE_RUN_ONCE, get_scheduler
+from .Storage import atomic_write_bytes, atomic_write_json
 
 
 # ===========================
@@ -17,9 +28,28 @@ BASE_DIR = Path(__file__).resolve().parent          # /COGS
 ROOT_DIR = BASE_DIR.parent                           # /CDA Pay
 JSON_DIR = ROOT_DIR / "JSON"                         # /CDA Pay/JSON
 BACKUP_DIR = ROOT_DIR / "BACKUPS"                    # /CDA Pay/BACKUPS
+BLOB_DIR = BACKUP_DIR / "blobs"                      # gzip'd file contents, by sha256
+MANIFEST_DIR = BACKUP_DIR / "manifests"              # one small manifest per snapshot
+ARCHIVE_DIR = BACKUP_DIR / "archives"                # tar of the most recent snapshots
+CATALOG_PATH = BACKUP_DIR / "catalog.json"           # every snapshot + blob reference counts
+HASH_CACHE_PATH = BACKUP_DIR / "hash_cache.json"     # path -> (size, mtime, sha256) for files read from disk
 
 JSON_DIR.mkdir(exist_ok=True)
 BACKUP_DIR.mkdir(exist_ok=True)
+BLOB_DIR.mkdir(exist_ok=True)
+MANIFEST_DIR.mkdir(exist_ok=True)
+ARCHIVE_DIR.mkdir(exist_ok=True)
+
+ARCHIVES_KEPT = 3
+
+# Flat-file backups from before snapshots, e.g. OCT_2026_20261019_030000.json
+LEGACY_BACKUP_NAME = re.compile(r"[A-Z]{3}_\d{4}_\d{8}_\d{6}\.json")
+
+# Upload pipeline
+UPLOAD_QUEUE_SIZE = 3          # pending uploads before new ones are dropped
+UPLOAD_ATTEMPTS = 5
+UPLOAD_BACKOFF_MAX = 60        # seconds
+UPLOAD_HEADROOM = 64 * 1024    # multipart/form overhead kept free under the limit
 
 SERVER_CONFIG_PATH = JSON_DIR / "server.json"
 
@@ -37,7 +67,8 @@ def load_server_config():
         "roles": {
             "payer": "Payer",
             "trial_payer": "Trial Payer",
-            "stat_edit": "Stat Edit"
+            "stat_edit": "Stat Edit",
+            "foundation": "Foundation"
         },
         "time": {
             "timezone": "Europe/London",
@@ -46,6 +77,12 @@ def load_server_config():
         },
         "users": {
             "target_user": 0
+        },
+        "backups": {
+            "daily": 7,
+            "weekly": 4,
+            "monthly": 12,
+            "upload_limit_mb": 8
         }
     }
 
@@ -72,10 +109,14 @@ def load_server_config():
         cfg_users = cfg["users"].copy()
         cfg_users.update(data.get("users", {}))
 
+        cfg_backups = cfg["backups"].copy()
+        cfg_backups.update(data.get("backups", {}))
+
         cfg["channels"] = cfg_channels
         cfg["roles"] = cfg_roles
         cfg["time"] = cfg_time
         cfg["users"] = cfg_users
+        cfg["backups"] = cfg_backups
 
         return cfg
 
@@ -83,6 +124,308 @@ def load_server_config():
         return default_config
 
 
+# ===========================
+# Content-addressed backup store
+# ===========================
+
+class BackupStore:
+    """
+    Deduplicated, compressed backups of everything under JSON/.
+
+    Each file's contents are stored once as BACKUPS/blobs/<aa>/<sha256>.gz.
+    A snapshot is just a manifest in BACKUPS/manifests/ mapping relative
+    paths to hashes, so a day where nothing changed costs one small
+    manifest. The newest snapshots are also kept as a self-contained tar
+    (files + MANIFEST.json) in BACKUPS/archives/ for shipping elsewhere.
+
+    BACKUPS/catalog.json lists every snapshot with the blobs it uses and
+    keeps a reference count per blob, so listing and pruning never walk
+    the backup directories. All methods block; call them from a worker
+    thread, starting with load(). Code on the event loop reads `view`, a
+    copy of the catalog replaced (never mutated) after every change.
+    """
+
+    def __init__(self, backup_dir: Path, blob_dir: Path, manifest_dir: Path, archive_dir: Path, catalog_path: Path,
+                 hash_cache_path: Path):
+        self.backup_dir = backup_dir
+        self.blob_dir = blob_dir
+        self.manifest_dir = manifest_dir
+        self.archive_dir = archive_dir
+        self.catalog_path = catalog_path
+        self.hash_cache_path = hash_cache_path
+        self._lock = threading.Lock()
+        self.catalog = {"snapshots": {}, "blob_refs": {}, "legacy": {}}
+        self.hash_cache = {}
+        self.view = {"snapshots": {}, "blob_refs": {}, "legacy": {}}
+
+    def load(self):
+        """Read (or rebuild) the catalog and hash cache. Blocks."""
+        with self._lock:
+            self.catalog = self._load_catalog()
+            self.hash_cache = self._load_hash_cache()
+            self._publish()
+
+    # ── catalog ──────────────────────────────────────────
+    def _load_catalog(self) -> dict:
+        try:
+            with open(self.catalog_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return self._rebuild_catalog()
+
+    def _rebuild_catalog(self) -> dict:
+        """One-off scan to build the catalog from whatever is already on disk."""
+        catalog = {"snapshots": {}, "blob_refs": {}, "legacy": {}}
+        for path in sorted(self.manifest_dir.glob("*.json")):
+            with open(path, "r") as f:
+                manifest = json.load(f)
+            blobs = sorted({entry["sha256"] for entry in manifest["files"].values()})
+            catalog["snapshots"][path.stem] = {
+                "created": manifest["created"],
+                "files": len(manifest["files"]),
+                "size": sum(entry["size"] for entry in manifest["files"].values()),
+                "blobs": blobs,
+                "archive": (self.archive_dir / f"{path.stem}.tar").exists(),
+            }
+            for sha in blobs:
+                catalog["blob_refs"][sha] = catalog["blob_refs"].get(sha, 0) + 1
+
+        # Pre-snapshot backups were flat copies in BACKUPS/
+        for path in self.backup_dir.iterdir():
+            if path.is_file() and LEGACY_BACKUP_NAME.fullmatch(path.name):
+                created = datetime.fromtimestamp(path.stat().st_ctime)
+                catalog["legacy"][path.name] = created.isoformat(timespec="seconds")
+
+        atomic_write_json(self.catalog_path, catalog)
+        return catalog
+
+    def _save_catalog(self):
+        atomic_write_json(self.catalog_path, self.catalog)
+        self._publish()
+
+    def _publish(self):
+        self.view = json.loads(json.dumps(self.catalog))
+
+    def _load_hash_cache(self) -> dict:
+        try:
+            with open(self.hash_cache_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def list_snapshots(self) -> list:
+        return sorted(self.view["snapshots"])
+
+    # ── blobs ────────────────────────────────────────────
+    def blob_path(self, sha: str) -> Path:
+        return self.blob_dir / sha[:2] / f"{sha}.gz"
+
+    def put_blob(self, sha: str, data: bytes) -> int:
+        """Store data under its hash; returns bytes written (0 if already stored)."""
+        if self.catalog["blob_refs"].get(sha):
+            return 0
+        path = self.blob_path(sha)
+        path.parent.mkdir(exist_ok=True)
+        compressed = gzip.compress(data, compresslevel=9)
+        atomic_write_bytes(path, compressed)
+        return len(compressed)
+
+    def get_blob(self, sha: str) -> bytes:
+        with open(self.blob_path(sha), "rb") as f:
+            return gzip.decompress(f.read())
+
+    # ── snapshots ────────────────────────────────────────
+    def create_snapshot(self, snapshot_id: str, files: dict, disk_files: dict, capture_ms: float) -> dict:
+        """
+        Store one snapshot from live {relative path: bytes} plus files on
+        disk {relative path: Path}. Disk files whose size and mtime match
+        the hash cache are neither read nor hashed again. An ID that is
+        already taken (two snapshots in the same second) gets a suffix.
+        """
+        with self._lock:
+            base_id, n = snapshot_id, 2
+            while snapshot_id in self.catalog["snapshots"] or (self.manifest_dir / f"{snapshot_id}.json").exists():
+                snapshot_id = f"{base_id}_{n}"
+                n += 1
+
+            entries = {}
+            changed = []
+            bytes_written = 0
+            for rel, data in sorted(files.items()):
+                sha = hashlib.sha256(data).hexdigest()
+                written = self.put_blob(sha, data)
+                if written:
+                    changed.append(rel)
+                    bytes_written += written
+                entries[rel] = {"sha256": sha, "size": len(data)}
+
+            hash_cache = {}
+            for rel, path in sorted(disk_files.items()):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                cached = self.hash_cache.get(rel)
+                if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns \
+                        and self.catalog["blob_refs"].get(cached[2]):
+                    sha = cached[2]
+                else:
+                    data = path.read_bytes()
+                    sha = hashlib.sha256(data).hexdigest()
+                    written = self.put_blob(sha, data)
+                    if written:
+                        changed.append(rel)
+                        bytes_written += written
+                hash_cache[rel] = [st.st_size, st.st_mtime_ns, sha]
+                entries[rel] = {"sha256": sha, "size": st.st_size}
+
+            manifest = {
+                "id": snapshot_id,
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "capture_ms": round(capture_ms, 2),
+                "files": entries,
+            }
+            atomic_write_json(self.manifest_dir / f"{snapshot_id}.json", manifest)
+            archive = self.write_archive(manifest, files, {rel: disk_files[rel] for rel in hash_cache})
+
+            blobs = sorted({entry["sha256"] for entry in entries.values()})
+            self.catalog["snapshots"][snapshot_id] = {
+                "created": manifest["created"],
+                "files": len(entries),
+                "size": sum(entry["size"] for entry in entries.values()),
+                "blobs": blobs,
+                "archive": True,
+            }
+            refs = self.catalog["blob_refs"]
+            for sha in blobs:
+                refs[sha] = refs.get(sha, 0) + 1
+            self._save_catalog()
+
+            self.hash_cache = hash_cache
+            atomic_write_json(self.hash_cache_path, hash_cache)
+        return {"manifest": manifest, "changed": changed, "bytes_written": bytes_written, "archive": archive}
+
+    def archive_path(self, snapshot_id: str) -> Path:
+        return self.archive_dir / f"{snapshot_id}.tar"
+
+    def write_archive(self, manifest: dict, files: dict, disk_files: dict) -> Path:
+        """Tar the snapshot straight to disk; files on disk are streamed into it, not loaded."""
+        path = self.archive_path(manifest["id"])
+        tmp = path.with_name(f".{path.name}.tmp")
+        try:
+            with open(tmp, "wb") as f:
+                with tarfile.open(fileobj=f, mode="w") as tar:
+                    members = [("MANIFEST.json", json.dumps(manifest, indent=4).encode("utf-8"))]
+                    members += sorted(files.items())
+                    for name, data in members:
+                        info = tarfile.TarInfo(name)
+                        info.size = len(data)
+                        info.mtime = int(time.time())
+                        tar.addfile(info, io.BytesIO(data))
+                    for rel, disk_path in sorted(disk_files.items()):
+                        tar.add(str(disk_path), arcname=rel, recursive=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return path
+
+    def load_manifest(self, snapshot_id: str) -> dict:
+        with open(self.manifest_dir / f"{snapshot_id}.json", "r") as f:
+            return json.load(f)
+
+    def load_verified(self, snapshot_id: str) -> dict:
+        """{relative path: bytes} for a snapshot, checked against its manifest."""
+        manifest = self.load_manifest(snapshot_id)
+        files = {}
+        for rel, entry in manifest["files"].items():
+            try:
+                data = self.get_blob(entry["sha256"])
+            except (OSError, EOFError) as e:
+                raise ValueError(f"blob for {rel} is missing or unreadable ({e})")
+            if hashlib.sha256(data).hexdigest() != entry["sha256"] or len(data) != entry["size"]:
+                raise ValueError(f"checksum mismatch for {rel}")
+            files[rel] = data
+        return files
+
+    # ── retention ────────────────────────────────────────
+    def select_retained(self, daily: int, weekly: int, monthly: int, snapshots: dict = None) -> dict:
+        """
+        Grandfather-father-son selection: the newest snapshot of each of the
+        last `daily` days, `weekly` ISO weeks and `monthly` months, plus the
+        newest snapshot overall. Returns {snapshot_id: [tiers]}.
+        """
+        if snapshots is None:
+            snapshots = self.catalog["snapshots"]
+        ordered = sorted(snapshots, key=lambda sid: snapshots[sid]["created"], reverse=True)
+        retained = {sid: ["latest"] for sid in ordered[:1]}
+        tiers = (
+            ("daily", daily, lambda d: d.date()),
+            ("weekly", weekly, lambda d: d.isocalendar()[:2]),
+            ("monthly", monthly, lambda d: (d.year, d.month)),
+        )
+        for tier, count, period_of in tiers:
+            periods = set()
+            for sid in ordered:
+                if len(periods) >= count:
+                    break
+                period = period_of(datetime.fromisoformat(snapshots[sid]["created"]))
+                if period in periods:
+                    continue
+                periods.add(period)
+                retained.setdefault(sid, []).append(tier)
+        return retained
+
+    def apply_retention(self, daily: int, weekly: int, monthly: int, archives_kept: int) -> dict:
+        with self._lock:
+            retained = self.select_retained(daily, weekly, monthly)
+            snapshots = self.catalog["snapshots"]
+            refs = self.catalog["blob_refs"]
+
+            expired = [sid for sid in snapshots if sid not in retained]
+            removed_blobs = 0
+            for sid in expired:
+                entry = snapshots.pop(sid)
+                (self.manifest_dir / f"{sid}.json").unlink(missing_ok=True)
+                if entry.get("archive"):
+                    self.archive_path(sid).unlink(missing_ok=True)
+                for sha in entry["blobs"]:
+                    refs[sha] = refs.get(sha, 1) - 1
+                    if refs[sha] <= 0:
+                        del refs[sha]
+                        self.blob_path(sha).unlink(missing_ok=True)
+                        removed_blobs += 1
+
+            # Tars only for the newest few; the blobs keep the rest
+            with_archive = sorted(sid for sid, entry in snapshots.items() if entry.get("archive"))
+            for sid in with_archive[:-archives_kept] if archives_kept else with_archive:
+                self.archive_path(sid).unlink(missing_ok=True)
+                snapshots[sid]["archive"] = False
+
+            # Flat-file backups from before snapshots: age out after the daily tier
+            cutoff = datetime.now() - timedelta(days=daily)
+            legacy = self.catalog.setdefault("legacy", {})
+            for name, created in list(legacy.items()):
+                if not LEGACY_BACKUP_NAME.fullmatch(name):
+                    # Catalogs built before the name check also listed hash_cache.json
+                    del legacy[name]
+                elif datetime.fromisoformat(created) < cutoff:
+                    (self.backup_dir / name).unlink(missing_ok=True)
+                    del legacy[name]
+
+            self._save_catalog()
+        return {"expired": expired, "removed_blobs": removed_blobs, "retained": retained}
+
+
+def compress_and_split(path: Path, part_size: int) -> list:
+    """gzip a file and cut the result into parts of at most part_size bytes."""
+    with open(path, "rb") as f:
+        compressed = gzip.compress(f.read(), compresslevel=9)
+    return [compressed[i:i + part_size] for i in range(0, len(compressed), part_size)] or [b""]
+
+
 # ===========================
 # Backup Cog
 # ===========================
@@ -92,109 +435,330 @@ class JSONBackup(commands.Cog):
         self.bot = bot
         self.cfg = load_server_config()
 
-        # Determine correct monthly log file
-        month_file = datetime.now().strftime("%b_%Y").upper() + ".json"
-        self.json_file = JSON_DIR / month_file
-        self.ensure_json_file_exists()
+        self.store = BackupStore(BACKUP_DIR, BLOB_DIR, MANIFEST_DIR, ARCHIVE_DIR, CATALOG_PATH, HASH_CACHE_PATH)
 
         self.notification_channel_id = self.cfg["channels"].get("backup_notifications")
 
-        self.backup_task.start()
-
         # owner ID
         self.bot.owner_id = 298121351871594497
 
+    async def cog_load(self):
+        await asyncio.to_thread(self.store.load)
+
+        self._upload_queue = asyncio.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+        self._upload_worker = asyncio.create_task(self.upload_worker())
+
+        # Run once a day at the configured time, in the configured timezone
+        cfg_time = self.cfg["time"]
+        get_scheduler(self.bot).add_job(
+            "daily_backup",
+            self.backup_task,
+            CronTrigger(
+                hour=cfg_time.get("hour", 21),
+                minute=cfg_time.get("minute", 0),
+                timezone=cfg_time.get("timezone", "Europe/London")
+            ),
+            misfire=MISFIRE_RUN_ONCE,
+        )
+
     def cog_unload(self):
-        self.backup_task.cancel()
+        get_scheduler(self.bot).remove_job("daily_backup")
+        self._upload_worker.cancel()
 
-    # Run once a day at the configured time
-    @tasks.loop(hours=24)
     async def backup_task(self):
         await self.backup_json()
         await self.cleanup_old_backups()
 
-    @backup_task.before_loop
-    async def before_backup(self):
-        await self.bot.wait_until_ready()
-
-        cfg_time = self.cfg["time"]
-        tz = ZoneInfo(cfg_time.get("timezone", "Europe/London"))
-        now = datetime.now(tz)
-
-        next_run = now.replace(
-            hour=cfg_time.get("hour", 21),
-            minute=cfg_time.get("minute", 0),
-            second=0,
-            microsecond=0
+    def capture_snapshot(self) -> dict:
+        """
+        Serialise the live stores as one consistent set.
+
+        Runs synchronously on the event loop, so no command can change a
+        store halfway through. Only cogs exposing snapshot_files()
+        (PayTracker, PayVoid, ...) are captured here; everything else under
+        JSON/ is handled on the worker thread by disk_files().
+        """
+        files = {}
+        for cog in self.bot.cogs.values():
+            snapshot_files = getattr(cog, "snapshot_files", None)
+            if snapshot_files is not None:
+                files.update(snapshot_files())
+        return files
+
+    @staticmethod
+    def disk_files(exclude) -> dict:
+        """{relative path: Path} for files under JSON/ not captured from memory. Blocks."""
+        found = {}
+        for path in JSON_DIR.rglob("*"):
+            if path.is_file() and not path.name.startswith("."):
+                rel = path.relative_to(JSON_DIR).as_posix()
+                if rel not in exclude:
+                    found[rel] = path
+        return found
+
+    def _store_snapshot(self, snapshot_id: str, files: dict, capture_ms: float) -> dict:
+        return self.store.create_snapshot(snapshot_id, files, self.disk_files(files), capture_ms)
+
+    async def capture_all(self) -> dict:
+        """Live stores plus every other file's bytes (read on a worker thread), for restore diffs."""
+        files = self.capture_snapshot()
+        disk = await asyncio.to_thread(
+            lambda: {rel: path.read_bytes() for rel, path in self.disk_files(files).items()}
         )
-
-        if now >= next_run:
-            next_run += timedelta(days=1)
-
-        wait_time = (next_run - now).total_seconds()
-        print(f"[BACKUP] First task scheduled in {wait_time} seconds.")
-        await asyncio.sleep(wait_time)
+        disk.update(files)
+        return disk
+
+    async def take_snapshot(self, snapshot_id: str = None) -> dict:
+        snapshot_id = snapshot_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        start = time.perf_counter()
+        files = self.capture_snapshot()
+        capture_ms = (time.perf_counter() - start) * 1000
+        result = await asyncio.to_thread(self._store_snapshot, snapshot_id, files, capture_ms)
+        result["capture_ms"] = capture_ms
+        return result
 
     async def backup_json(self):
         try:
-            self.ensure_json_file_exists()
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            # Use a more descriptive backup filename based on the monthly JSON
-            month_stem = self.json_file.stem  # e.g. DEC_2025
-            backup_file = BACKUP_DIR / f"{month_stem}_{timestamp}.json"
-
-            # Read original JSON
-            async with aiofiles.open(self.json_file, "r") as f:
-                content = await f.read()
-
-            # Write to backup
-            async with aiofiles.open(backup_file, "w") as f:
-                await f.write(content)
-
-            print(f"[BACKUP] Created: {backup_file}")
-
-            # Notify channel
-            channel = self.bot.get_channel(self.notification_channel_id)
-            if channel:
-                await channel.send(
-                    f"Backup created for {month_stem} at {timestamp}.",
-                    file=discord.File(backup_file)
-                )
-
-        except FileNotFoundError:
-            print(f"[BACKUP ERROR] JSON file not found: {self.json_file}")
+            result = await self.take_snapshot()
+            snapshot_id = result["manifest"]["id"]
+            file_count = len(result["manifest"]["files"])
+
+            changed = result["changed"]
+            summary = (
+                f"Backup {snapshot_id}: {file_count} files captured in {result['capture_ms']:.1f} ms, "
+                f"{len(changed)} changed ({result['bytes_written'] / 1024:.1f} KB stored)."
+            )
+            if changed:
+                summary += "\nChanged: " + ", ".join(f"`{name}`" for name in changed)
+            print(f"[BACKUP] {summary}")
+
+            # Upload happens in the background so a slow post never delays the next backup
+            self.queue_upload(summary, result["archive"])
+
         except Exception as e:
             print(f"[BACKUP ERROR] {e}")
 
-    def ensure_json_file_exists(self):
-        if not self.json_file.exists():
-            with open(self.json_file, "w") as file:
-                json.dump({
-                    "records": {},
-                    "daily_totals": {},
-                    "weekly_totals": {}
-                }, file, indent=4)
+    # ===========================
+    # Upload pipeline
+    # ===========================
+
+    def queue_upload(self, summary: str, archive: Path):
+        try:
+            self._upload_queue.put_nowait((summary, archive))
+            metrics.gauge("backup_upload.queued", self._upload_queue.qsize())
+        except asyncio.QueueFull:
+            metrics.incr("backup_upload.dropped")
+            print(f"[BACKUP] Upload queue full, not posting {archive.name}")
+
+    async def upload_worker(self):
+        await self.bot.wait_until_ready()
+        while True:
+            summary, archive = await self._upload_queue.get()
+            try:
+                await self.upload_archive(summary, archive)
+            except Exception as e:
+                metrics.incr("backup_upload.failed")
+                print(f"[BACKUP UPLOAD ERROR] {e}")
+            finally:
+                self._upload_queue.task_done()
+                metrics.gauge("backup_upload.queued", self._upload_queue.qsize())
+
+    def upload_limit(self, channel) -> int:
+        configured = int(float(load_server_config()["backups"].get("upload_limit_mb", 8)) * 1024 * 1024)
+        guild_limit = getattr(getattr(channel, "guild", None), "filesize_limit", configured)
+        return max(1024 * 1024, min(configured, guild_limit) - UPLOAD_HEADROOM)
+
+    async def upload_archive(self, summary: str, archive: Path):
+        channel = self.bot.get_channel(self.notification_channel_id)
+        if not channel:
+            return
+        if not archive.exists():
+            # Pruned before its turn came up
+            metrics.incr("backup_upload.skipped")
+            return
+
+        start = time.perf_counter()
+        parts = await asyncio.to_thread(compress_and_split, archive, self.upload_limit(channel))
+        metrics.gauge("backup_upload.bytes", sum(len(part) for part in parts))
+        metrics.gauge("backup_upload.parts_total", len(parts))
+        metrics.gauge("backup_upload.parts_sent", 0)
+
+        base_name = f"{archive.stem}.tar.gz"
+        for index, part in enumerate(parts, start=1):
+            if len(parts) == 1:
+                filename, content = base_name, summary
+            else:
+                filename = f"{base_name}.part{index:02d}"
+                content = f"Part {index}/{len(parts)} of `{base_name}`"
+                if index == 1:
+                    content = f"{summary}\n{content} – join with `cat {base_name}.part* > {base_name}`"
+            await self.send_with_retry(channel, content, part, filename)
+            metrics.gauge("backup_upload.parts_sent", index)
+
+        metrics.observe("backup_upload.seconds", time.perf_counter() - start)
+        metrics.incr("backup_upload.succeeded")
+
+    async def send_with_retry(self, channel, content: str, data: bytes, filename: str):
+        for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+            try:
+                await channel.send(content, file=discord.File(io.BytesIO(data), filename=filename))
+                return
+            except discord.HTTPException as e:
+                retryable = e.status == 429 or e.status >= 500
+                if not retryable or attempt == UPLOAD_ATTEMPTS:
+                    raise
+                retry_after = getattr(e, "retry_after", None) or 0
+                delay = min(UPLOAD_BACKOFF_MAX, max(retry_after, 2 ** attempt))
+                metrics.incr("backup_upload.retries")
+                print(f"[BACKUP] Upload of {filename} got {e.status}, retrying in {delay}s")
+                await asyncio.sleep(delay)
+
+    # ===========================
+    # Restore
+    # ===========================
+
+    @staticmethod
+    def _records_by_day(data: bytes) -> dict:
+        """{pay_date: {record_id, ...}} for a pay month file, or {} for anything else."""
+        try:
+            parsed = json.loads(data)
+        except ValueError:
+            return {}
+        if not isinstance(parsed, dict) or "records" not in parsed:
+            return {}
+        return {
+            day: {str(r.get("record_id")) for r in records}
+            for day, records in parsed["records"].items()
+        }
+
+    def diff_summary(self, current: dict, restored: dict) -> list:
+        lines = []
+        for rel in sorted(set(current) | set(restored)):
+            if rel not in restored:
+                lines.append(f"`{rel}`: not in snapshot, left as is")
+                continue
+            if rel not in current:
+                lines.append(f"`{rel}`: restored (currently missing)")
+                continue
+            if current[rel] == restored[rel]:
+                continue
+
+            now_days = self._records_by_day(current[rel])
+            then_days = self._records_by_day(restored[rel])
+            day_lines = []
+            for day in sorted(set(now_days) | set(then_days)):
+                added = len(then_days.get(day, set()) - now_days.get(day, set()))
+                removed = len(now_days.get(day, set()) - then_days.get(day, set()))
+                if added or removed:
+                    day_lines.append(f"  {day}: +{added} / -{removed} records")
+            lines.append(f"`{rel}`: changed")
+            lines.extend(day_lines)
+        return lines
+
+    def _stage_restore(self, files: dict) -> list:
+        staged = []
+        for rel, data in files.items():
+            dest = JSON_DIR / rel
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            tmp = dest.with_name(f".{dest.name}.restore")
+            with open(tmp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            staged.append((tmp, dest))
+        return staged
+
+    async def restore_snapshot(self, snapshot_id: str, apply: bool = False) -> str:
+        """
+        Verify a snapshot, report what restoring it would change and, if
+        apply is set, swap the files in, hot-reload every cog that keeps
+        data in memory (anything with reload_from_disk()) and reload config.
+        """
+        files = await asyncio.to_thread(self.store.load_verified, snapshot_id)
+        changes = self.diff_summary(await self.capture_all(), files)
+        header = f"Snapshot `{snapshot_id}` verified ({len(files)} files)."
+        if not changes:
+            return header + "\nNothing differs from the live data."
+        if not apply:
+            return "\n".join([header, "**Dry run** – restoring would change:"] + changes)
+
+        safety = await self.take_snapshot(datetime.now().strftime("%Y%m%d_%H%M%S") + "_pre_restore")
+        staged = await asyncio.to_thread(self._stage_restore, files)
+
+        # Let writes already on a worker thread land first; pending ones are
+        # discarded by reload_from_disk() before they can run.
+        writers = [
+            writer for cog in self.bot.cogs.values()
+            for writer in getattr(cog, "json_writers", list)()
+        ]
+        while any(writer.busy for writer in writers):
+            await asyncio.gather(*(writer.settle() for writer in writers))
+
+        # Swap and reload without yielding so no command sees a half-restored state
+        for tmp, dest in staged:
+            os.replace(tmp, dest)
+        reloaded = []
+        for cog in self.bot.cogs.values():
+            reload_from_disk = getattr(cog, "reload_from_disk", None)
+            if reload_from_disk is not None:
+                reload_from_disk()
+                reloaded.append(cog.qualified_name)
+        # server.json may have changed roles and channels: same as !reloadconfig
+        role_cache.invalidate()
+        self.bot.dispatch("config_reload")
+
+        print(f"[BACKUP] Restored snapshot {snapshot_id}; reloaded {', '.join(reloaded)}")
+        return "\n".join(
+            [header, "**Restored.** Changes applied:"] + changes +
+            [f"Reloaded: {', '.join(reloaded) or 'nothing'}",
+             f"Previous state saved as `{safety['manifest']['id']}`."]
+        )
 
     async def cleanup_old_backups(self):
         try:
-            now = datetime.now()
-            for file in BACKUP_DIR.iterdir():
-                if file.is_file():
-                    age_days = (now - datetime.fromtimestamp(file.stat().st_ctime)).days
-                    if age_days > 7:
-                        file.unlink()
-                        print(f"[BACKUP] Deleted old backup: {file}")
+            tiers = load_server_config()["backups"]
+            result = await asyncio.to_thread(
+                self.store.apply_retention,
+                int(tiers.get("daily", 7)),
+                int(tiers.get("weekly", 4)),
+                int(tiers.get("monthly", 12)),
+                ARCHIVES_KEPT,
+            )
+            if result["expired"]:
+                print(f"[BACKUP] Pruned {len(result['expired'])} snapshots, "
+                      f"{result['removed_blobs']} unreferenced blobs.")
         except Exception as e:
             print(f"[BACKUP CLEANUP ERROR] {e}")
 
     @commands.command(name="backup", help="Triggers an immediate backup.")
     async def manual_backup(self, ctx):
-        if not any(role.name == "Foundation" for role in ctx.author.roles) and ctx.author.id != self.bot.owner_id:
+        if not has_roles(ctx.author, "foundation") and ctx.author.id != self.bot.owner_id:
             return await ctx.send("You do not have permission to use this command.")
 
         await self.backup_json()
         await self.cleanup_old_backups()
         await ctx.send("Backup completed.", delete_after=10)
 
+    @commands.command(name="backups", help="Lists retained backup snapshots and their retention tiers.")
+    @commands.is_owner()
+    async def list_backups(self, ctx):
+        tiers = load_server_config()["backups"]
+        catalog = self.store.view
+        snapshots = catalog["snapshots"]
+        retained = self.store.select_retained(
+            int(tiers.get("daily", 7)), int(tiers.get("weekly", 4)), int(tiers.get("monthly", 12)), snapshots
+        )
+        if not snapshots:
+            return await ctx.send("No backup snapshots yet.", delete_after=10)
+
+        lines = []
+        for sid in sorted(snapshots, reverse=True)[:20]:
+            entry = snapshots[sid]
+            kept = ", ".join(retained.get(sid, ["expiring"]))
+            archive = " · tar" if entry.get("archive") else ""
+            lines.append(f"`{sid}` – {entry['files']} files, {entry['size'] / 1024:.0f} KB ({kept}){archive}")
+        blob_count = len(catalog["blob_refs"])
+        await ctx.send(f"**{len(snapshots)} snapshots, {blob_count} blobs**\n" + "\n".join(lines))
+
 async def setup(bot):
     await bot.add_cog(JSONBackup(bot))
@@ -2,9 +2,13 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 
+from .NoahAuditLog import summarise_record
+from .Permissions import require_roles
+
 
 class PayLookup(commands.Cog):
     def __init__(self, bot):
@@ -34,6 +38,9 @@ class PayLookup(commands.Cog):
                 )
 
         # Load JSON content
+        self.reload_from_disk()
+
+    def reload_from_disk(self):
         with open(self.file_path, "r") as f:
             self.pay_data = json.load(f)
 
@@ -44,6 +51,7 @@ class PayLookup(commands.Cog):
         name="lookup",
         description="Look up pay record by message_id, record_id, pay_time, pay_date, amount_paid, or bonus_paid"
     )
+    @require_roles("foundation", message="You do not have the required 'Foundation' role to use this command.")
     async def lookup(
             self,
             interaction: discord.Interaction,
@@ -56,14 +64,6 @@ class PayLookup(commands.Cog):
             min_bonus: int = None,
             max_bonus: int = None
     ):
-        # Check if the user has the "Foundation" role
-        foundation_role = discord.utils.get(interaction.user.roles, name="Foundation")
-        if not foundation_role:
-            await interaction.response.send_message(
-                "You do not have the required 'Foundation' role to use this command.", ephemeral=True
-            )
-            return
-
         # Validate pay_time and pay_date dependency
         if (pay_time and not pay_date) or (pay_date and not pay_time):
             await interaction.response.send_message(
@@ -126,5 +126,95 @@ class PayLookup(commands.Cog):
             await interaction.followup.send("**No matching records found**")
 
 
+    @admin.command(
+        name="audit",
+        description="Search the local audit trail by user, command and time."
+    )
+    @app_commands.describe(
+        user="Only events by this user.",
+        command="Only this command name, e.g. paystat or editpay.",
+        hours="How far back to look (default 24).",
+        limit="Maximum events to show (default 20)."
+    )
+    @require_roles("foundation", message="You do not have the required 'Foundation' role to use this command.")
+    async def audit(
+            self,
+            interaction: discord.Interaction,
+            user: discord.User = None,
+            command: str = None,
+            hours: app_commands.Range[int, 1, 24 * 365] = 24,
+            limit: app_commands.Range[int, 1, 50] = 20
+    ):
+        audit_cog = self.bot.get_cog("BotAuditCog")
+        if audit_cog is None:
+            await interaction.response.send_message("The audit cog is not loaded.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        start = time.perf_counter()
+        records = await audit_cog.query_audit_trail(
+            user_id=user.id if user else None,
+            command=command.lstrip("/!") if command else None,
+            since=time.time() - hours * 3600,
+            limit=limit
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if not records:
+            await interaction.followup.send(f"**No audit events found** ({elapsed_ms:.0f} ms)", ephemeral=True)
+            return
+
+        lines = [summarise_record(record) for record in records]
+        body = ""
+        for line in lines:
+            if len(body) + len(line) > 3800:
+                body += "\n…"
+                break
+            body += line[:300] + "\n"
+        embed = discord.Embed(title=f"Audit Trail – {len(records)} events", description=body, color=discord.Color.teal())
+        embed.set_footer(text=f"Last {hours}h · queried in {elapsed_ms:.0f} ms")
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    @admin.command(
+        name="restore",
+        description="Restore data files from a backup snapshot. Dry run unless confirm is set."
+    )
+    @app_commands.describe(
+        snapshot="Snapshot ID, e.g. 20260114_230000.",
+        confirm="Set to True to apply the restore; otherwise only the diff is shown."
+    )
+    async def restore(self, interaction: discord.Interaction, snapshot: str, confirm: bool = False):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message(
+                "Only the bot owner can restore backups.", ephemeral=True
+            )
+            return
+
+        backup_cog = self.bot.get_cog("JSONBackup")
+        if backup_cog is None:
+            await interaction.response.send_message("The backup cog is not loaded.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            report = await backup_cog.restore_snapshot(snapshot, apply=confirm)
+        except FileNotFoundError:
+            report = f"No snapshot `{snapshot}` found."
+        except ValueError as e:
+            report = f"Restore aborted: {e}"
+
+        if len(report) > 1900:
+            report = report[:1900] + "\n…"
+        await interaction.followup.send(report, ephemeral=True)
+
+    @restore.autocomplete("snapshot")
+    async def restore_snapshot_autocomplete(self, interaction: discord.Interaction, current: str):
+        backup_cog = self.bot.get_cog("JSONBackup")
+        if backup_cog is None:
+            return []
+        snapshots = [sid for sid in backup_cog.store.list_snapshots() if current in sid]
+        return [app_commands.Choice(name=sid, value=sid) for sid in reversed(snapshots[-25:])]
+
+
 async def setup(bot):
     await bot.add_cog(PayLookup(bot))
@@ -1,13 +1,21 @@
+import asyncio
+import heapq
 import json
 import os
+import time
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
 
 import discord
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
 from discord import app_commands
 from discord.ext import commands
 
+from .Permissions import check_roles, get_roles
+from .Scheduler import MISFIRE_SKIP, get_scheduler
+from .Storage import CoalescingJsonWriter, atomic_write_text
+
 BASE_DIR = Path(__file__).resolve().parent          # /COGS
 ROOT_DIR = BASE_DIR.parent                          # /CDA Pay
 JSON_DIR = ROOT_DIR / "JSON"                        # /CDA Pay/JSON
@@ -15,13 +23,18 @@ JSON_DIR.mkdir(exist_ok=True)
 
 SERVER_CONFIG_PATH = JSON_DIR / "server.json"
 VOID_DATA_FILE = JSON_DIR / "CDAVoidData.json"
+VOID_LOG_FILE = JSON_DIR / "CDAVoidLog.jsonl"      # append-only void journal
+
+# Most voids kept per user for /payvoidhistory, regardless of window length
+HISTORY_MAXLEN = 50
 
 def load_server_config():
     default_config = {'channels': {'admin_stats': 0, 'paystat_allowed': 0, 'payvoid_allowed': 0},
  'roles': {'payer': 'Payer',
            'stat_edit': 'Stat Edit',
            'trial_payer': 'Trial Payer'},
- 'time': {'hour': 23, 'minute': 0, 'timezone': 'Europe/London'}}
+ 'time': {'hour': 23, 'minute': 0, 'timezone': 'Europe/London'},
+ 'voids': {'announce_expiry': False, 'threshold': 3, 'window_hours': 168}}
 
     if not SERVER_CONFIG_PATH.exists():
         with open(SERVER_CONFIG_PATH, "w") as f:
@@ -39,19 +52,18 @@ def load_server_config():
         cfg_roles.update(data.get("roles", {}))
         cfg_time = cfg["time"].copy()
         cfg_time.update(data.get("time", {}))
+        cfg_voids = cfg["voids"].copy()
+        cfg_voids.update(data.get("voids", {}))
         cfg["channels"] = cfg_channels
         cfg["roles"] = cfg_roles
         cfg["time"] = cfg_time
+        cfg["voids"] = cfg_voids
         return cfg
     except Exception:
         return default_config
 
 def get_payer_mentions(guild: discord.Guild):
-    cfg = load_server_config()
-    payer_name = cfg.get("roles", {}).get("payer", "Payer")
-    trial_name = cfg.get("roles", {}).get("trial_payer", "Trial Payer")
-    wanted = {payer_name, trial_name}
-    roles = [r for r in getattr(guild, "roles", []) if r.name in wanted]
+    roles = get_roles(guild, "payer", "trial_payer")
     mention_text = " ".join(r.mention for r in roles)
     allowed = discord.AllowedMentions(roles=roles)
     return mention_text, allowed
@@ -65,147 +77,463 @@ def ensure_file():
 # ─────────────────────────────
 
 
-def has_payer_role(member: discord.Member) -> bool:
-    cfg = load_server_config()
-    payer_name = cfg.get("roles", {}).get("payer", "Payer")
-    trial_name = cfg.get("roles", {}).get("trial_payer", "Trial Payer")
-    wanted = {payer_name, trial_name}
-    return any(getattr(role, "name", None) in wanted for role in getattr(member, "roles", []))
+async def check_payer(interaction: discord.Interaction) -> bool:
+    return await check_roles(interaction, "payer", "trial_payer", message="You don’t have permission to do that.")
 
 # ─────────────────────────────
 
+class VoidStore:
+    """
+    Void records from CDAVoidData.json with active bans indexed by expiry.
+
+    `_ban_expiry` maps every banned key to its expiry timestamp and
+    `_ban_heap` orders those bans by expiry. Heap entries are dropped lazily:
+    one only counts while it still matches `_ban_expiry`.
+
+    Individual voids live in `history` – one deque of (timestamp, voided_by)
+    per user, oldest first – and are appended to CDAVoidLog.jsonl as they
+    happen. Entries older than `window` seconds are trimmed whenever a user
+    is touched and by `sweep()`, so only users with recent voids stay in
+    memory.
+    """
+
+    def __init__(self, path: Path, log_path: Path, window: float):
+        ensure_file()
+        with open(path, "r") as f:
+            self.data: dict = json.load(f)
+        self.data.setdefault("voids", {})
+        self.writer = CoalescingJsonWriter(path, lambda: self.data)
+
+        self.window = window
+        self.log_path = log_path
+        self.history = {}
+        self._log_lines = 0
+        self._log_lock = asyncio.Lock()
+        self._load_log()
+        self._migrate_counts()
+
+        self._ban_expiry = {}
+        self._ban_heap = []
+        for key, rec in self.data["voids"].items():
+            if rec.get("ban_until"):
+                ts = datetime.fromisoformat(rec["ban_until"]).timestamp()
+                self._ban_expiry[key] = ts
+                self._ban_heap.append((ts, key))
+        heapq.heapify(self._ban_heap)
+
+    def _load_log(self):
+        if not self.log_path.exists():
+            return
+        cutoff = time.time() - self.window
+        with open(self.log_path, "r") as f:
+            for line in f:
+                self._log_lines += 1
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("ts", 0) > cutoff:
+                    self.history.setdefault(
+                        entry["key"], deque(maxlen=HISTORY_MAXLEN)
+                    ).append((entry["ts"], entry.get("by")))
+
+    def _migrate_counts(self):
+        """
+        Turn legacy `void_count` integers into journal entries. The old
+        records carry no void times, so each counted void is dated now and
+        stays counted for one full window.
+        """
+        now = time.time()
+        migrated = False
+        lines = []
+        for key, rec in self.data["voids"].items():
+            count = rec.pop("void_count", None)
+            if count is None:
+                continue
+            migrated = True
+            rec.setdefault("counted_from", 0)
+            if count <= 0 or key in self.history:
+                continue
+            dq = self.history.setdefault(key, deque(maxlen=HISTORY_MAXLEN))
+            for _ in range(count):
+                dq.append((now, None))
+                lines.append(json.dumps({"key": key, "ts": now, "by": None}) + "\n")
+
+        if not migrated:
+            return
+        # Journal first: if we stop in between, the counts are still on disk.
+        if lines:
+            self._append_log("".join(lines))
+            self._log_lines += len(lines)
+        atomic_write_text(self.writer.path, json.dumps(self.data, indent=4))
+        print(f"[PAYVOID] Migrated {len(lines)} legacy void(s) into the journal.")
+
+    @property
+    def voids(self) -> dict:
+        return self.data["voids"]
+
+    def save(self):
+        self.writer.mark_dirty()
+
+    def record(self, key: str, label: str) -> dict:
+        rec = self.voids.setdefault(key, {"ban_until": None, "counted_from": 0})
+        rec["label"] = label
+        return rec
+
+    # ── rolling window ───────────────────────────────────
+    def _trim(self, key: str, now: float):
+        dq = self.history.get(key)
+        if dq is None:
+            return None
+        cutoff = now - self.window
+        while dq and dq[0][0] <= cutoff:
+            dq.popleft()
+        if not dq:
+            del self.history[key]
+            return None
+        return dq
+
+    def recent_voids(self, key: str) -> list:
+        """(timestamp, voided_by) for the user's voids inside the window."""
+        dq = self._trim(key, time.time())
+        return list(dq) if dq else []
+
+    def void_count(self, key: str) -> int:
+        """Voids inside the window that happened after the user's last ban."""
+        dq = self._trim(key, time.time())
+        if not dq:
+            return 0
+        counted_from = self.voids.get(key, {}).get("counted_from", 0)
+        return sum(1 for ts, _ in dq if ts > counted_from)
+
+    async def add_void(self, key: str, voided_by: int) -> int:
+        now = time.time()
+        self.history.setdefault(key, deque(maxlen=HISTORY_MAXLEN)).append((now, voided_by))
+        line = json.dumps({"key": key, "ts": now, "by": voided_by}) + "\n"
+        async with self._log_lock:
+            await asyncio.to_thread(self._append_log, line)
+            self._log_lines += 1
+        return self.void_count(key)
+
+    def _append_log(self, line: str):
+        with open(self.log_path, "a") as f:
+            f.write(line)
+
+    def sweep(self):
+        """Trim every tracked user and forget users with nothing left to track."""
+        now = time.time()
+        for key in list(self.history):
+            self._trim(key, now)
+        stale = [
+            key for key, rec in self.voids.items()
+            if not rec.get("ban_until") and key not in self.history
+        ]
+        for key in stale:
+            del self.voids[key]
+        if stale:
+            self.save()
+
+    def _log_text(self) -> str:
+        entries = sorted(
+            (ts, key, by) for key, dq in self.history.items() for ts, by in dq
+        )
+        return "".join(
+            json.dumps({"key": key, "ts": ts, "by": by}) + "\n" for ts, key, by in entries
+        )
+
+    async def compact_log(self):
+        """Rewrite the journal with only in-window voids once it is mostly dead lines."""
+        live = sum(len(dq) for dq in self.history.values())
+        if self._log_lines <= 2 * live + 100:
+            return
+        async with self._log_lock:
+            text = self._log_text()
+            await asyncio.to_thread(atomic_write_text, self.log_path, text)
+            self._log_lines = text.count("\n")
+
+    def snapshot_files(self) -> dict:
+        """Current void data and journal, serialised from memory."""
+        return {
+            VOID_DATA_FILE.name: json.dumps(self.data, indent=4).encode("utf-8"),
+            self.log_path.name: self._log_text().encode("utf-8"),
+        }
+
+    # ── bans ─────────────────────────────────────────────
+    def is_banned(self, key: str) -> bool:
+        ts = self._ban_expiry.get(key)
+        return ts is not None and ts > time.time()
+
+    def ban(self, key: str, until: datetime):
+        rec = self.voids[key]
+        rec["counted_from"] = time.time()
+        rec["ban_until"] = until.isoformat()
+        ts = until.timestamp()
+        self._ban_expiry[key] = ts
+        heapq.heappush(self._ban_heap, (ts, key))
+        self.save()
+
+    def next_expiry(self):
+        """Timestamp of the earliest active ban, or None."""
+        while self._ban_heap:
+            ts, key = self._ban_heap[0]
+            if self._ban_expiry.get(key) == ts:
+                return ts
+            heapq.heappop(self._ban_heap)
+        return None
+
+    def pop_expired(self, now: float = None) -> list:
+        """Clear every ban that has run out and return the affected records."""
+        now = time.time() if now is None else now
+        expired = []
+        while self._ban_heap and self._ban_heap[0][0] <= now:
+            ts, key = heapq.heappop(self._ban_heap)
+            if self._ban_expiry.get(key) != ts:
+                continue
+            del self._ban_expiry[key]
+            rec = self.voids.get(key)
+            if rec is not None:
+                rec["ban_until"] = None
+                expired.append(rec)
+        if expired:
+            self.save()
+        return expired
+
+    def active_bans(self) -> list:
+        """(expiry_ts, key) for every active ban, soonest first."""
+        now = time.time()
+        return sorted((ts, key) for key, ts in self._ban_expiry.items() if ts > now)
+
+
 class PayVoid(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        ensure_file()
-        with open(VOID_DATA_FILE, "r") as f:
-            self.data: dict = json.load(f)
 
-        # weekly reset – uses timezone + hour/minute from server config
+        # rolling void window – length + ban threshold from server config
         cfg = load_server_config()
-        tcfg = cfg.get("time", {})
-        tz_name = tcfg.get("timezone", "Europe/London")
-        reset_hour = int(tcfg.get("hour", 23))
-        reset_minute = int(tcfg.get("minute", 0))
-
-        self.scheduler = AsyncIOScheduler(timezone=tz_name)
-        self.scheduler.add_job(
-            self.reset_voids,
-            trigger="cron",
-            day_of_week="sun",
-            hour=reset_hour,
-            minute=reset_minute,
-            id="weekly_void_reset",
-            coalesce=True,
-            misfire_grace_time=300,
+        vcfg = cfg.get("voids", {})
+        self.void_threshold = int(vcfg.get("threshold", 3))
+        window_hours = float(vcfg.get("window_hours", 168))
+
+        self.store = VoidStore(VOID_DATA_FILE, VOID_LOG_FILE, window_hours * 3600)
+        self._expiry_wakeup = asyncio.Event()
+        self._expiry_task = None
+
+
+    async def cog_load(self):
+        self._expiry_task = asyncio.create_task(self.expire_bans())
+        get_scheduler(self.bot).add_job(
+            "void_window_sweep",
+            self.sweep_voids,
+            IntervalTrigger(minutes=15),
+            misfire=MISFIRE_SKIP,
         )
-        self.scheduler.start()
 
     # ── helpers ───────────────────────────────────────────
-    def save(self):
-        with open(VOID_DATA_FILE, "w") as f:
-            json.dump(self.data, f, indent=4)
+    async def sweep_voids(self):
+        self.store.sweep()
+        await self.store.compact_log()
 
-    def reset_voids(self):
-        self.data["voids"] = {}
-        self.save()
+    def apply_ban(self, key: str) -> datetime:
+        ban_until_raw = datetime.now() + timedelta(hours=24)
+        ban_until = ban_until_raw.replace(minute=0, second=0, microsecond=0)
+        self.store.ban(key, ban_until)
+        self._expiry_wakeup.set()
+        return ban_until
+
+    async def expire_bans(self):
+        """Sleep until the earliest ban runs out, clear it, repeat."""
+        await self.bot.wait_until_ready()
+        while True:
+            self._expiry_wakeup.clear()
+            next_ts = self.store.next_expiry()
+            timeout = None if next_ts is None else max(0.0, next_ts - time.time())
+            try:
+                await asyncio.wait_for(self._expiry_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+            for rec in self.store.pop_expired():
+                try:
+                    await self.announce_expiry(rec)
+                except Exception as e:
+                    print(f"[PAYVOID] Failed to announce ban expiry: {e}")
+
+    async def announce_expiry(self, rec: dict):
+        cfg = load_server_config()
+        if not cfg.get("voids", {}).get("announce_expiry"):
+            return
+        channel_id = cfg.get("channels", {}).get("payvoid_allowed")
+        channel = self.bot.get_channel(channel_id) if channel_id else None
+        if not channel:
+            return
+        embed = discord.Embed(
+            title="Pay Ban Expired",
+            description=f"**User:** `{rec.get('label', 'Unknown')}`",
+            color=discord.Color.green()
+        )
+        await channel.send(embed=embed)
+
+    async def send_ban_embed(self, interaction: discord.Interaction, label: str, ban_until: datetime):
+        mention_text, allowed_mentions = get_payer_mentions(interaction.guild)
+
+        embed = discord.Embed(
+            title="Pay Ban",
+            description=(
+                f"**User:** `{label}`\n"
+                f"**Until:** <t:{int(ban_until.timestamp())}:f>"
+            ),
+            color=discord.Color.red()
+        )
+        await interaction.response.send_message(
+            content=mention_text,
+            embed=embed,
+            allowed_mentions=allowed_mentions
+        )
+
+    async def check_void_channel(self, interaction: discord.Interaction) -> bool:
+        cfg = load_server_config()
+        allowed_channel_id = cfg.get("channels", {}).get("payvoid_allowed")
+        if not allowed_channel_id or interaction.channel_id != allowed_channel_id:
+            await interaction.response.send_message(
+                "Wrong channel for this command.", ephemeral=True
+            )
+            return False
+        return True
 
     # ── /payvoid ──────────────────────────────────────────
     @app_commands.command(
         name="payvoid",
-        description="Void a user’s pay. Three voids = 24hr Pay Ban."
+        description="Void a user’s pay. Reaching the void limit = 24hr Pay Ban."
     )
     @app_commands.describe(username="Type the username exactly.")
     async def payvoid(self, interaction: discord.Interaction, username: str):
         # --- errors returned ephemerally ---
-        cfg = load_server_config()
-        allowed_channel_id = cfg.get("channels", {}).get("payvoid_allowed")
-        if not allowed_channel_id or interaction.channel_id != allowed_channel_id:
-            await interaction.response.send_message(
-                "Wrong channel for this command.", ephemeral=True
-            )
+        if not await self.check_void_channel(interaction):
             return
-        if not has_payer_role(interaction.user):
-            await interaction.response.send_message(
-                "You don’t have permission to do that.", ephemeral=True
-            )
+        if not await check_payer(interaction):
             return
         # ------------------------------------
 
         key   = username.strip().lower()
         label = username.strip()
 
-        rec = self.data["voids"].setdefault(
-            key, {"void_count": 0, "ban_until": None}
-        )
+        # clear anything the expiry timer hasn't reached yet
+        self.store.pop_expired()
+        self.store.record(key, label)
 
-        # ── if already banned, start a new 24 h period immediately ──
-        if rec["ban_until"]:
-            active_until = datetime.fromisoformat(rec["ban_until"])
-            if active_until > datetime.now():
-                new_until_raw = datetime.now() + timedelta(hours=24)
-                new_until = new_until_raw.replace(minute=0, second=0, microsecond=0)
-                rec["ban_until"] = new_until.isoformat()
-                self.save()
-
-                mention_text, allowed_mentions = get_payer_mentions(interaction.guild)
-
-                embed = discord.Embed(
-                    title="Pay Ban",
-                    description=(
-                        f"**User:** `{label}`\n"
-                        f"**Until:** <t:{int(new_until.timestamp())}:f>"
-                    ),
-                    color=discord.Color.red()
-                )
-                await interaction.response.send_message(
-                    content=mention_text,
-                    embed=embed,
-                    allowed_mentions=allowed_mentions
-                )
-                return
-            # ban expired → clear
-            rec.update({"void_count": 0, "ban_until": None})
+        # ── if already banned, start a new 24 h period immediately ──
+        if self.store.is_banned(key):
+            new_until = self.apply_ban(key)
+            await self.send_ban_embed(interaction, label, new_until)
+            return
 
         # ── record the void ──
-        rec["void_count"] += 1
-
-        # ── third void → apply fresh 24hr ban ──
-        if rec["void_count"] >= 3:
-            rec["void_count"] = 0
-            ban_until_raw = datetime.now() + timedelta(hours=24)
-            ban_until = ban_until_raw.replace(minute=0, second=0, microsecond=0)
-            rec["ban_until"] = ban_until.isoformat()
-            self.save()
+        void_count = await self.store.add_void(key, interaction.user.id)
 
-            mention_text, allowed_mentions = get_payer_mentions(interaction.guild)
-
-            embed = discord.Embed(
-                title="Pay Ban",
-                description=(
-                    f"**User:** `{label}`\n"
-                    f"**Until:** <t:{int(ban_until.timestamp())}:f>"
-                ),
-                color=discord.Color.red()
-            )
-            await interaction.response.send_message(
-                content=mention_text,
-                embed=embed,
-                allowed_mentions=allowed_mentions
-            )
+        # ── threshold reached inside the window → apply fresh 24hr ban ──
+        if void_count >= self.void_threshold:
+            ban_until = self.apply_ban(key)
+            await self.send_ban_embed(interaction, label, ban_until)
         else:
-            # ── 1/3 or 2/3 voids ──
-            self.save()
+            # ── below the threshold ──
+            self.store.save()
             embed = discord.Embed(
                 title="Void Recorded",
-                description=f"**User:** `{label}`\n **Voids:** {rec['void_count']}",
+                description=f"**User:** `{label}`\n **Voids:** {void_count}/{self.void_threshold}",
                 color=discord.Color.red()
             )
             await interaction.response.send_message(embed=embed)
 
+    # ── /payvoidhistory ───────────────────────────────────
+    @app_commands.command(
+        name="payvoidhistory",
+        description="Show a user’s voids inside the current void window."
+    )
+    @app_commands.describe(username="Type the username exactly.")
+    async def payvoidhistory(self, interaction: discord.Interaction, username: str):
+        if not await self.check_void_channel(interaction):
+            return
+        if not await check_payer(interaction):
+            return
+
+        key = username.strip().lower()
+        voids = self.store.recent_voids(key)
+        window_hours = int(self.store.window // 3600)
+        if not voids:
+            await interaction.response.send_message(
+                f"No voids for `{username.strip()}` in the last {window_hours}h.", ephemeral=True
+            )
+            return
+
+        lines = [
+            f"<t:{int(ts)}:f> – by <@{by}>" if by else f"<t:{int(ts)}:f>"
+            for ts, by in reversed(voids)
+        ]
+        embed = discord.Embed(
+            title=f"Void History – {username.strip()}",
+            description="\n".join(lines[:25]),
+            color=discord.Color.red()
+        )
+        embed.set_footer(
+            text=f"{self.store.void_count(key)}/{self.void_threshold} counting towards a ban · "
+                 f"{window_hours}h window"
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    # ── /paybans ──────────────────────────────────────────
+    @app_commands.command(
+        name="paybans",
+        description="List active Pay Bans, soonest expiry first."
+    )
+    async def paybans(self, interaction: discord.Interaction):
+        if not await self.check_void_channel(interaction):
+            return
+        if not await check_payer(interaction):
+            return
+
+        bans = self.store.active_bans()
+        if not bans:
+            await interaction.response.send_message("No active Pay Bans.", ephemeral=True)
+            return
+
+        lines = []
+        for ts, key in bans[:25]:
+            label = self.store.voids.get(key, {}).get("label", key)
+            lines.append(f"`{label}` – until <t:{int(ts)}:f> (<t:{int(ts)}:R>)")
+        if len(bans) > 25:
+            lines.append(f"…and {len(bans) - 25} more.")
+
+        embed = discord.Embed(
+            title=f"Active Pay Bans ({len(bans)})",
+            description="\n".join(lines),
+            color=discord.Color.red()
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    def snapshot_files(self) -> dict:
+        return self.store.snapshot_files()
+
+    def json_writers(self) -> list:
+        return [self.store.writer]
+
+    def reload_from_disk(self):
+        """Swap in the store from disk after a backup restore."""
+        self.store.writer.discard()
+        self.store = VoidStore(VOID_DATA_FILE, VOID_LOG_FILE, self.store.window)
+        self._expiry_wakeup.set()
+
+    @commands.Cog.listener()
+    async def on_config_reload(self):
+        vcfg = load_server_config().get("voids", {})
+        self.void_threshold = int(vcfg.get("threshold", 3))
+        self.store.window = float(vcfg.get("window_hours", 168)) * 3600
+
     # ── cleanup ───────────────────────────────────────────
     def cog_unload(self):
-        self.scheduler.shutdown(wait=False)
+        get_scheduler(self.bot).remove_job("void_window_sweep")
+        if self._expiry_task:
+            self._expiry_task.cancel()
+        self.store.writer.flush_now()
 
 
 async def setup(bot: commands.Bot):
@@ -0,0 +1,179 @@
+import json
+from pathlib import Path
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+BASE_DIR = Path(__file__).resolve().parent          # /COGS
+ROOT_DIR = BASE_DIR.parent                          # /CDA Pay
+JSON_DIR = ROOT_DIR / "JSON"                        # /CDA Pay/JSON
+JSON_DIR.mkdir(exist_ok=True)
+SERVER_CONFIG_PATH = JSON_DIR / "server.json"
+
+
+def load_server_config():
+    default_config = {
+        "roles": {
+            "payer": "Payer",
+            "trial_payer": "Trial Payer",
+            "stat_edit": "Stat Edit",
+            "foundation": "Foundation"
+        }
+    }
+
+    if not SERVER_CONFIG_PATH.exists():
+        return default_config
+
+    try:
+        with open(SERVER_CONFIG_PATH, "r") as f:
+            data = json.load(f)
+        cfg = default_config.copy()
+        cfg_roles = cfg["roles"].copy()
+        cfg_roles.update(data.get("roles", {}))
+        cfg["roles"] = cfg_roles
+        return cfg
+    except Exception:
+        return default_config
+
+
+# ===========================
+# Role cache
+# ===========================
+
+class RoleCache:
+    """
+    Resolves configured role keys ("payer", "stat_edit", ...) to role IDs.
+
+    Role names are read from server.json once, and each guild's IDs are
+    resolved on first use. Both stay cached until a role event or a config
+    reload invalidates them, so a permission check is a handful of ID
+    lookups against the member's role list.
+    """
+
+    def __init__(self):
+        self._role_names = None
+        self._guild_roles = {}   # guild_id -> {role_key: frozenset(role_ids)}
+
+    def invalidate(self, guild_id: int = None):
+        if guild_id is None:
+            self._role_names = None
+            self._guild_roles.clear()
+        else:
+            self._guild_roles.pop(guild_id, None)
+
+    def role_ids(self, guild: discord.Guild, *keys: str) -> frozenset:
+        if guild is None:
+            return frozenset()
+        if self._role_names is None:
+            self._role_names = load_server_config()["roles"]
+
+        resolved = self._guild_roles.setdefault(guild.id, {})
+        ids = set()
+        for key in keys:
+            if key not in resolved:
+                name = self._role_names.get(key)
+                resolved[key] = frozenset(r.id for r in guild.roles if r.name == name)
+            ids |= resolved[key]
+        return frozenset(ids)
+
+
+role_cache = RoleCache()
+
+
+def has_roles(member, *keys: str) -> bool:
+    """True if the member holds any of the configured roles named by keys."""
+    guild = getattr(member, "guild", None)
+    if guild is None or not isinstance(member, discord.Member):
+        return False
+    return any(member.get_role(role_id) for role_id in role_cache.role_ids(guild, *keys))
+
+
+def get_roles(guild: discord.Guild, *keys: str) -> list:
+    """The guild's Role objects for the configured role keys."""
+    roles = (guild.get_role(role_id) for role_id in role_cache.role_ids(guild, *keys))
+    return [role for role in roles if role is not None]
+
+
+class PermissionDenied(app_commands.CheckFailure):
+    """A role or channel check failed; the message is shown to the user."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+DEFAULT_DENIAL = "You do not have permission to use this command."
+
+
+def require_roles(*keys: str, message: str = DEFAULT_DENIAL):
+    """app_commands check: the user must hold one of the configured roles."""
+    async def predicate(interaction: discord.Interaction) -> bool:
+        if has_roles(interaction.user, *keys):
+            return True
+        raise PermissionDenied(message)
+    return app_commands.check(predicate)
+
+
+async def check_roles(interaction: discord.Interaction, *keys: str, message: str = DEFAULT_DENIAL) -> bool:
+    """
+    In-handler form of require_roles, for commands that must check
+    something else (such as the channel) first. Sends the denial itself.
+    """
+    if has_roles(interaction.user, *keys):
+        return True
+    await interaction.response.send_message(message, ephemeral=True)
+    return False
+
+
+# ===========================
+# Cache invalidation
+# ===========================
+
+class PermissionService(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self._previous_on_error = None
+
+    async def cog_load(self):
+        # Answer PermissionDenied quietly instead of letting the default
+        # tree handler log every denial as an error with a traceback.
+        self._previous_on_error = self.bot.tree.on_error
+        self.bot.tree.on_error = self.on_app_command_error
+
+    async def cog_unload(self):
+        if self._previous_on_error is not None:
+            self.bot.tree.on_error = self._previous_on_error
+
+    async def on_app_command_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        if isinstance(error, PermissionDenied):
+            if interaction.response.is_done():
+                await interaction.followup.send(error.message, ephemeral=True)
+            else:
+                await interaction.response.send_message(error.message, ephemeral=True)
+            return
+        await self._previous_on_error(interaction, error)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        role_cache.invalidate(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            role_cache.invalidate(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        role_cache.invalidate(role.guild.id)
+
+    @commands.command(name="reloadconfig", help="Reloads server.json for cogs that cache it.")
+    @commands.is_owner()
+    async def reload_config(self, ctx):
+        role_cache.invalidate()
+        self.bot.dispatch("config_reload")
+        await ctx.send("Config reloaded.", delete_after=10)
+
+
+async def setup(bot):
+    await bot.add_cog(PermissionService(bot))
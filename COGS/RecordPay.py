@@ -2,12 +2,23 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import asyncio
+import hashlib
 import json
 import os
 import logging
 import random
+from collections import OrderedDict
 from pathlib import Path
 
+import aiohttp
+from apscheduler.triggers.cron import CronTrigger
+
+from .Metrics import metrics
+from .Permissions import check_roles, require_roles
+from .Scheduler import MISFIRE_RUN_ONCE, get_scheduler
+
 # Configure command_logger
 command_logger = logging.getLogger("command_logger")
 logging.basicConfig(level=logging.INFO)
@@ -19,6 +30,18 @@ JSON_DIR.mkdir(exist_ok=True)
 
 SERVER_CONFIG_PATH = JSON_DIR / "server.json"
 
+# Stats publishing: the last pay slot of the day triggers it, the scheduled
+# job catches days where that slot was never recorded.
+LAST_PAY_SLOT = "7-8 PM"
+PUBLISH_ATTEMPTS = 4
+PUBLISH_BACKOFF = 5  # seconds, doubled after each failed attempt
+
+# Rendered stats embeds kept in memory, keyed by period
+STATS_CACHE_SIZE = 64
+
+# Fields a record adds to its day's and week's totals
+TOTAL_FIELDS = ("people_paid", "people_denied", "paytime_paid", "bonus_paid", "total_paid")
+
 
 def load_server_config():
     default_config = {
@@ -37,6 +60,10 @@ def load_server_config():
         },
         "users": {
             "target_user": 0
+        },
+        "stats": {
+            "publish_hour": 21,
+            "publish_minute": 0
         }
     }
 
@@ -63,10 +90,14 @@ def load_server_config():
         cfg_users = cfg["users"].copy()
         cfg_users.update(data.get("users", {}))
 
+        cfg_stats = cfg["stats"].copy()
+        cfg_stats.update(data.get("stats", {}))
+
         cfg["channels"] = cfg_channels
         cfg["roles"] = cfg_roles
         cfg["time"] = cfg_time
         cfg["users"] = cfg_users
+        cfg["stats"] = cfg_stats
 
         return cfg
     except Exception:
@@ -111,11 +142,11 @@ class PayTimeConfirmationView(discord.ui.View):
 
 
 
-def generate_unique_id(existing_ids):
-    """Generate a unique 5-digit ID."""
+def generate_unique_id(*existing_ids):
+    """Generate a 5-digit ID not in any of the given containers."""
     while True:
         unique_id = str(random.randint(10000, 99999))
-        if unique_id not in existing_ids:
+        if not any(unique_id in ids for ids in existing_ids):
             return unique_id
 
 
@@ -161,15 +192,6 @@ def get_previous_hour():
     return previous_hour.strftime("%I:00 %p"), now.strftime("%Y-%m-%d")
 
 
-def has_payer_role(interaction: discord.Interaction) -> bool:
-    role_names = [role.name for role in interaction.user.roles]
-    return "Payer" in role_names
-
-
-def has_founder_role(interaction: discord.Interaction) -> bool:
-    role_names = [role.name for role in interaction.user.roles]
-    return "Stat Edit" in role_names
-
 def calculate_week_start(date_str: str) -> str:
     date_obj = datetime.strptime(date_str, "%Y-%m-%d")
     start_of_week = date_obj - timedelta(days=date_obj.weekday())  # Monday is 0 in Python's weekday()
@@ -183,6 +205,83 @@ class PayTracker(commands.Cog):
         self.file_path = JSON_DIR / current_month_file
         self.ensure_file_exists()
         self.pay_data = self.load_data()
+        self.record_index = self.build_record_index()
+        self._migration_task = None
+        self._publish_tasks = set()
+        self._publish_lock = asyncio.Lock()
+
+        self.apply_config(load_server_config())
+
+        # Stats render cache: ("daily"|"weekly", period) -> (data version, embed).
+        # Writes bump the version of the day and week they touch.
+        self._stats_versions = {}
+        self._stats_cache = OrderedDict()
+
+    def apply_config(self, cfg: dict):
+        """Cache the channel ID, timezone and publish time this cog uses."""
+        self.admin_stats_id = cfg.get("channels", {}).get("admin_stats")
+        self.stats_timezone = cfg["time"].get("timezone", "Europe/London")
+        self.stats_tz = ZoneInfo(self.stats_timezone)
+        self.publish_hour = int(cfg["stats"].get("publish_hour", 21))
+        self.publish_minute = int(cfg["stats"].get("publish_minute", 0))
+
+    def schedule_publish(self):
+        # Publish anything the last-slot trigger missed, at the configured time
+        get_scheduler(self.bot).add_job(
+            "pay_stats_publish",
+            self.publish_due_stats,
+            CronTrigger(hour=self.publish_hour, minute=self.publish_minute, timezone=self.stats_timezone),
+            misfire=MISFIRE_RUN_ONCE,
+        )
+
+    async def cog_load(self):
+        self._migration_task = asyncio.create_task(self.migrate_message_refs())
+        self.schedule_publish()
+
+    def cog_unload(self):
+        get_scheduler(self.bot).remove_job("pay_stats_publish")
+        if self._migration_task is not None:
+            self._migration_task.cancel()
+        for task in list(self._publish_tasks):
+            task.cancel()
+
+    async def migrate_message_refs(self):
+        """
+        Fill in channel_id on records posted before it was stored, so
+        editpay can edit them without a fetch. /paystat only runs in the
+        paystat channel, so that is where every older embed was posted.
+        """
+        channel_id = load_server_config().get("channels", {}).get("paystat_allowed")
+        if not channel_id:
+            return
+
+        migrated = 0
+        for records in list(self.pay_data["records"].values()):
+            for record in records:
+                if record.get("message_id") and not record.get("channel_id"):
+                    record["channel_id"] = channel_id
+                    migrated += 1
+            await asyncio.sleep(0)  # yield between days
+
+        if migrated:
+            self.save_data()
+            print(f"[PAYSTAT] Added channel IDs to {migrated} existing record(s).")
+
+    def build_record_index(self) -> dict:
+        """record_id -> record, so lookups don't scan every day's records."""
+        return {
+            record["record_id"]: record
+            for records in self.pay_data.get("records", {}).values()
+            for record in records
+        }
+
+    def record_message(self, record: dict):
+        """Partial message for a record's posted embed (no fetch), or None if it has none."""
+        message_id = record.get("message_id")
+        channel = self.bot.get_channel(record.get("channel_id") or 0)
+        if not message_id or channel is None:
+            return None
+        return channel.get_partial_message(message_id)
 
     def ensure_file_exists(self):
         if not os.path.exists(self.file_path):
@@ -212,7 +311,68 @@ class PayTracker(commands.Cog):
         with open(self.file_path, "w") as file:
             json.dump(self.pay_data, file, indent=4)
 
-    async def send_daily_stats(self, interaction: discord.Interaction, pay_date: str):
+    def snapshot_files(self):
+        """Current month's pay data, serialised from memory for backups."""
+        return {self.file_path.name: json.dumps(self.pay_data, indent=4).encode("utf-8")}
+
+    def reload_from_disk(self):
+        """Re-read the month file after a backup restore."""
+        self.pay_data = self.load_data()
+        self.record_index = self.build_record_index()
+        self._stats_versions.clear()
+        self._stats_cache.clear()
+        self._migration_task = asyncio.create_task(self.migrate_message_refs())
+
+    @commands.Cog.listener()
+    async def on_config_reload(self):
+        publish_at = (self.stats_timezone, self.publish_hour, self.publish_minute)
+        self.apply_config(load_server_config())
+        if (self.stats_timezone, self.publish_hour, self.publish_minute) != publish_at:
+            self.schedule_publish()
+
+    # ===========================
+    # Stats rendering
+    # ===========================
+    def bump_stats_version(self, pay_date: str):
+        """Invalidate cached stats for the day and week a write touched."""
+        for key in (("daily", pay_date), ("weekly", calculate_week_start(pay_date))):
+            self._stats_versions[key] = self._stats_versions.get(key, 0) + 1
+
+        # Stats already posted for this day or week are edited to match
+        published = self.pay_data.get("published_stats", {})
+        if pay_date in published.get("daily", {}) or calculate_week_start(pay_date) in published.get("weekly", {}):
+            self.queue_stats_publish(pay_date, post_new=False)
+
+    def stats_embed(self, kind: str, period: str) -> discord.Embed:
+        """
+        Daily ("daily", date) or weekly ("weekly", week_start) stats embed,
+        rendered once per data version. A daily embed also shows the
+        running weekly total, so it depends on the week's version too.
+        """
+        if kind == "daily":
+            version = (
+                self._stats_versions.get(("daily", period), 0),
+                self._stats_versions.get(("weekly", calculate_week_start(period)), 0),
+            )
+        else:
+            version = self._stats_versions.get(("weekly", period), 0)
+
+        key = (kind, period)
+        cached = self._stats_cache.get(key)
+        if cached is not None and cached[0] == version:
+            self._stats_cache.move_to_end(key)
+            metrics.incr("pay_stats.cache_hits")
+            return cached[1]
+
+        metrics.incr("pay_stats.renders")
+        embed = self.daily_stats_embed(period) if kind == "daily" else self.weekly_stats_embed(period)
+        self._stats_cache[key] = (version, embed)
+        self._stats_cache.move_to_end(key)
+        while len(self._stats_cache) > STATS_CACHE_SIZE:
+            self._stats_cache.popitem(last=False)
+        return embed
+
+    def daily_stats_embed(self, pay_date: str) -> discord.Embed:
         # Calculate the start of the week for the given date
         week_start_date = calculate_week_start(pay_date)
 
@@ -234,52 +394,35 @@ class PayTracker(commands.Cog):
             "total_paid": 0
         })
 
-        # Fetch admin channel by ID from server.json
-        cfg = load_server_config()
-        admin_channel_id = cfg.get("channels", {}).get("admin_stats")
-        admin_channel = interaction.guild.get_channel(admin_channel_id) if admin_channel_id else None
-
-        if admin_channel:
-            # Create the daily stats embed
-            daily_stats_embed = discord.Embed(
-                title="Daily Stats",
-                description=f"Summary for {pay_date}:",
-                color=discord.Color.green(),
-            )
-            daily_stats_embed.add_field(
-                name="Total People Paid", value=f"{daily_totals['people_paid']}", inline=False
-            )
-            daily_stats_embed.add_field(
-                name="Total People Denied", value=f"{daily_totals['people_denied']}", inline=False
-            )
-            daily_stats_embed.add_field(
-                name="Total Amount Paid Out", value=f"{daily_totals['paytime_paid']}c", inline=False
-            )
-            daily_stats_embed.add_field(
-                name="Total Bonus Paid", value=f"{daily_totals['bonus_paid']}c", inline=False
-            )
-            daily_stats_embed.add_field(
-                name="Running Total Paid", value=f"{daily_totals['total_paid']}c", inline=False
-            )
-            daily_stats_embed.add_field(
-                name="Running Weekly Total Paid", value=f"{weekly_totals['total_paid']}c", inline=False
-            )
-
-            # Send the embed to the admin channel
-            await admin_channel.send(embed=daily_stats_embed)
-        else:
-            await interaction.followup.send(
-                "Could not find the admin channel to send daily stats. Please check the channel ID.",
-                ephemeral=True,
-            )
-
-    async def send_weekly_stats(self, interaction: discord.Interaction):
-        # Get the start of the current week
-        now = datetime.now()
-        current_week_start = calculate_week_start(now.strftime("%Y-%m-%d"))
+        # Create the daily stats embed
+        daily_stats_embed = discord.Embed(
+            title="Daily Stats",
+            description=f"Summary for {pay_date}:",
+            color=discord.Color.green(),
+        )
+        daily_stats_embed.add_field(
+            name="Total People Paid", value=f"{daily_totals['people_paid']}", inline=False
+        )
+        daily_stats_embed.add_field(
+            name="Total People Denied", value=f"{daily_totals['people_denied']}", inline=False
+        )
+        daily_stats_embed.add_field(
+            name="Total Amount Paid Out", value=f"{daily_totals['paytime_paid']}c", inline=False
+        )
+        daily_stats_embed.add_field(
+            name="Total Bonus Paid", value=f"{daily_totals['bonus_paid']}c", inline=False
+        )
+        daily_stats_embed.add_field(
+            name="Running Total Paid", value=f"{daily_totals['total_paid']}c", inline=False
+        )
+        daily_stats_embed.add_field(
+            name="Running Weekly Total Paid", value=f"{weekly_totals['total_paid']}c", inline=False
+        )
+        return daily_stats_embed
 
-        # Fetch weekly totals for the current week
-        weekly_totals = self.pay_data.get("weekly_totals", {}).get(current_week_start, {
+    def weekly_stats_embed(self, week_start_date: str) -> discord.Embed:
+        # Fetch weekly totals for the week
+        weekly_totals = self.pay_data.get("weekly_totals", {}).get(week_start_date, {
             "people_paid": 0,
             "people_denied": 0,
             "paytime_paid": 0,
@@ -287,37 +430,124 @@ class PayTracker(commands.Cog):
             "total_paid": 0
         })
 
-        # Channel ID for the admin channel from server.json
-        cfg = load_server_config()
-        admin_channel_id = cfg.get("channels", {}).get("admin_stats")
-        admin_channel = interaction.guild.get_channel(admin_channel_id) if admin_channel_id else None
-
-        if admin_channel:
-            # Create the Weekly Stats embed
-            weekly_stats_embed = discord.Embed(
-                title="Weekly Stats",
-                description=f"Summary for the week starting {current_week_start}:",
-                color=discord.Color.purple(),
-            )
-            weekly_stats_embed.add_field(name="Total People Paid", value=f"{weekly_totals['people_paid']}",
-                                         inline=False)
-            weekly_stats_embed.add_field(name="Total People Denied", value=f"{weekly_totals['people_denied']}",
-                                         inline=False)
-            weekly_stats_embed.add_field(name="Total Amount Paid Out", value=f"{weekly_totals['paytime_paid']}c",
-                                         inline=False)
-            weekly_stats_embed.add_field(name="Total Bonus Paid", value=f"{weekly_totals['bonus_paid']}c", inline=False)
-            weekly_stats_embed.add_field(name="Total Paid", value=f"{weekly_totals['total_paid']}c", inline=False)
-            weekly_stats_embed.set_footer(text="End of Week Summary")
-
-            # Send the embed to the admin channel
-            await admin_channel.send(embed=weekly_stats_embed)
+        # Create the Weekly Stats embed
+        weekly_stats_embed = discord.Embed(
+            title="Weekly Stats",
+            description=f"Summary for the week starting {week_start_date}:",
+            color=discord.Color.purple(),
+        )
+        weekly_stats_embed.add_field(name="Total People Paid", value=f"{weekly_totals['people_paid']}",
+                                     inline=False)
+        weekly_stats_embed.add_field(name="Total People Denied", value=f"{weekly_totals['people_denied']}",
+                                     inline=False)
+        weekly_stats_embed.add_field(name="Total Amount Paid Out", value=f"{weekly_totals['paytime_paid']}c",
+                                     inline=False)
+        weekly_stats_embed.add_field(name="Total Bonus Paid", value=f"{weekly_totals['bonus_paid']}c", inline=False)
+        weekly_stats_embed.add_field(name="Total Paid", value=f"{weekly_totals['total_paid']}c", inline=False)
+        weekly_stats_embed.set_footer(text="End of Week Summary")
+        return weekly_stats_embed
+
+    # ===========================
+    # Stats publishing
+    # ===========================
+    def queue_stats_publish(self, pay_date: str, post_new: bool = True):
+        """Publish (or refresh) a day's stats in the background; runs are serialised."""
+        task = asyncio.create_task(self.publish_stats(pay_date, post_new))
+        self._publish_tasks.add(task)
+        task.add_done_callback(self._publish_tasks.discard)
+        return task
+
+    def has_last_slot(self, pay_date: str) -> bool:
+        return any(record.get("pay_time") == LAST_PAY_SLOT for record in self.pay_data["records"].get(pay_date, []))
+
+    async def publish_due_stats(self):
+        """
+        Scheduled run: publish yesterday's stats, and today's once the day
+        is complete (last slot recorded or publish time passed). A catch-up
+        run after a restart in the morning therefore leaves today alone.
+        """
+        now = datetime.now(self.stats_tz)
+        publish_at = now.replace(hour=self.publish_hour, minute=self.publish_minute, second=0, microsecond=0)
+        today = now.strftime("%Y-%m-%d")
+
+        pay_dates = [(now - timedelta(days=1)).strftime("%Y-%m-%d")]
+        if now >= publish_at or self.has_last_slot(today):
+            pay_dates.append(today)
+
+        for pay_date in pay_dates:
+            if pay_date in self.pay_data.get("daily_totals", {}):
+                await self.queue_stats_publish(pay_date)
+
+    async def publish_stats(self, pay_date: str, post_new: bool = True):
+        """
+        Post the day's stats (and the week's, on Sundays) to the admin channel.
+
+        Each posted period is recorded under "published_stats" in the month
+        file with its message and a digest of the embed. Re-runs never post
+        a period twice; when the data has changed since, the posted message
+        is edited instead. post_new=False only refreshes existing posts.
+        """
+        async with self._publish_lock:
+            published = self.pay_data.setdefault("published_stats", {"daily": {}, "weekly": {}})
+            await self.publish_period(published["daily"], pay_date, self.stats_embed("daily", pay_date), post_new)
+
+            if datetime.strptime(pay_date, "%Y-%m-%d").weekday() == 6:  # Sunday
+                week_start_date = calculate_week_start(pay_date)
+                await self.publish_period(
+                    published["weekly"], week_start_date, self.stats_embed("weekly", week_start_date), post_new
+                )
 
+    async def publish_period(self, posted: dict, period: str, embed: discord.Embed, post_new: bool):
+        digest = hashlib.sha1(json.dumps(embed.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()
+        entry = posted.get(period)
+
+        if entry is None:
+            if not post_new:
+                return
+            message = await self.send_stats(embed)
+            if message is None:
+                return
+            posted[period] = {"channel_id": message.channel.id, "message_id": message.id, "digest": digest}
             self.save_data()
-        else:
-            await interaction.followup.send(
-                "Could not find the specified channel to send weekly stats. Please check the channel ID.",
-                ephemeral=True,
-            )
+            return
+
+        if entry.get("digest") == digest:
+            return
+        channel = self.bot.get_channel(entry.get("channel_id") or 0)
+        if channel is None:
+            return
+        message = channel.get_partial_message(entry["message_id"])
+        if await self.with_retry(lambda: message.edit(embed=embed)) is not None:
+            entry["digest"] = digest
+            self.save_data()
+
+    async def send_stats(self, embed: discord.Embed):
+        """Send a stats embed to the admin channel, retrying transient failures."""
+        admin_channel = self.bot.get_channel(self.admin_stats_id) if self.admin_stats_id else None
+        if not admin_channel:
+            print("[PAYSTAT] Could not find the admin channel to send stats. Please check the channel ID.")
+            return None
+
+        return await self.with_retry(lambda: admin_channel.send(embed=embed))
+
+    async def with_retry(self, action):
+        """Run a REST call, retrying 5xx and connection errors with backoff; None if it never succeeds."""
+        delay = PUBLISH_BACKOFF
+        for attempt in range(1, PUBLISH_ATTEMPTS + 1):
+            try:
+                return await action()
+            except discord.HTTPException as e:
+                if e.status < 500:
+                    print(f"[PAYSTAT] Stats post rejected: {e}")
+                    return None
+                error = e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = e
+            print(f"[PAYSTAT] Stats post failed (attempt {attempt}/{PUBLISH_ATTEMPTS}): {error}")
+            if attempt < PUBLISH_ATTEMPTS:
+                await asyncio.sleep(delay)
+                delay *= 2
+        return None
 
     @app_commands.command(name="paystat", description="Add a new payment record.")
     @app_commands.describe(
@@ -336,7 +566,7 @@ class PayTracker(commands.Cog):
             bonus_paid: int
     ):
         try:
-            # Ensure channel and role permissions from server.json
+            # Ensure channel permissions from server.json
             cfg = load_server_config()
             allowed_channel_id = cfg.get("channels", {}).get("paystat_allowed")
             if not allowed_channel_id or interaction.channel_id != allowed_channel_id:
@@ -344,20 +574,11 @@ class PayTracker(commands.Cog):
                     "This command can only be used in the configured pay stats channel.", ephemeral=True
                 )
                 return
-
-            if not has_payer_role(interaction):
-                await interaction.response.send_message(
-                    "You do not have permission to use this command.", ephemeral=True
-                )
+            if not await check_roles(interaction, "payer"):
                 return
 
-            # Generate unique record ID
-            existing_ids = [
-                record.get("record_id")
-                for user_records in self.pay_data["records"].values()
-                for record in user_records
-            ]
-            record_id = generate_unique_id(existing_ids)
+            # Generate unique record ID (never reusing a deleted one)
+            record_id = generate_unique_id(self.record_index, self.pay_data.get("deleted_records", {}))
 
             # Determine pay time and date
             pay_time_data, pay_date = get_pay_time()
@@ -392,15 +613,14 @@ class PayTracker(commands.Cog):
                 # For non-boundary cases, defer so we get the thinking indicator
                 await interaction.response.defer(ephemeral=True)
 
-            # Check for duplicate record
-            for date_key, records in self.pay_data["records"].items():
-                for record in records:
-                    if record.get("pay_date") == pay_date and record.get("pay_time") == pay_time:
-                        await interaction.followup.send(
-                            f"A record already exists for {pay_date} at {pay_time}. No duplicates allowed.",
-                            ephemeral=True
-                        )
-                        return
+            # Check for duplicate record (records are grouped by date)
+            for record in self.pay_data["records"].get(pay_date, []):
+                if record.get("pay_time") == pay_time:
+                    await interaction.followup.send(
+                        f"A record already exists for {pay_date} at {pay_time}. No duplicates allowed.",
+                        ephemeral=True
+                    )
+                    return
 
             # Save record
             record = {
@@ -416,6 +636,7 @@ class PayTracker(commands.Cog):
             }
             date_key = pay_date
             self.pay_data["records"].setdefault(date_key, []).append(record)
+            self.record_index[record_id] = record
 
             # Update daily totals with safe defaults
             daily_totals = self.pay_data.setdefault("daily_totals", {}).setdefault(pay_date, {
@@ -446,13 +667,9 @@ class PayTracker(commands.Cog):
             weekly_totals["bonus_paid"] += bonus_paid
             weekly_totals["total_paid"] += paytime_paid + bonus_paid
 
+            self.bump_stats_version(pay_date)
             self.save_data()
             
-            if pay_time == "7-8 PM":
-                await self.send_daily_stats(interaction, pay_date)  # Send daily stats
-                if datetime.strptime(pay_date, "%Y-%m-%d").weekday() == 6:  # Sunday
-                    await self.send_weekly_stats(interaction)  # Send weekly stats if Sunday
-
             # Send confirmation embed
             embed = discord.Embed(title=f"{pay_date}", color=discord.Color.blue())
             embed.add_field(name="Pay Time", value=pay_time, inline=False)
@@ -465,6 +682,7 @@ class PayTracker(commands.Cog):
 
             # Post the embed publicly in the channel
             response_message = await interaction.channel.send(embed=embed)
+            record["channel_id"] = response_message.channel.id
             record["message_id"] = response_message.id
             self.save_data()
 
@@ -474,6 +692,10 @@ class PayTracker(commands.Cog):
                 ephemeral=True
             )
 
+            # Last slot of the day: post daily (and Sunday weekly) stats in the background
+            if pay_time == LAST_PAY_SLOT:
+                self.queue_stats_publish(pay_date)
+
         except discord.errors.NotFound as e:
             command_logger.error(f"Unknown webhook error: {e}", exc_info=True)
         except Exception as e:
@@ -488,6 +710,7 @@ class PayTracker(commands.Cog):
         bonus_paid="The updated bonus amount paid (optional).",
         pay_time="The updated pay time (optional, format: 1-2 PM)."
     )
+    @require_roles("stat_edit")
     async def editpay(
             self,
             interaction: discord.Interaction,
@@ -499,22 +722,8 @@ class PayTracker(commands.Cog):
             pay_time: str = None
     ):
         try:
-            # Check for 'founder' role
-            if not has_founder_role(interaction):
-                await interaction.response.send_message(
-                    "You do not have permission to use this command.", ephemeral=True
-                )
-                return
-
             # Find the record by its record_id
-            found_record = None
-            for date_key, records in self.pay_data["records"].items():
-                for record in records:
-                    if record["record_id"] == record_id:
-                        found_record = record
-                        break
-                if found_record:
-                    break
+            found_record = self.record_index.get(record_id)
 
             if not found_record:
                 await interaction.response.send_message(
@@ -522,6 +731,8 @@ class PayTracker(commands.Cog):
                 )
                 return
 
+            before_edit = dict(found_record)
+
             # Track changes for description
             changes = []
 
@@ -588,20 +799,25 @@ class PayTracker(commands.Cog):
             adjustment_amount_paid = found_record["paytime_paid"] - original_amount_paid
             adjustment_bonus_paid = found_record.get("bonus_paid", 0) - original_bonus_paid
             adjustment_total_paid = adjustment_amount_paid + adjustment_bonus_paid
+            adjustment_people_denied = found_record["people_denied"] - before_edit.get(
+                "people_denied", original_total_claiming - original_people_paid
+            )
 
             daily_totals["people_paid"] += adjustment_people_paid
-            daily_totals["people_denied"] = found_record["total_claiming"] - found_record["people_paid"]
+            daily_totals["people_denied"] += adjustment_people_denied
             daily_totals["paytime_paid"] += adjustment_amount_paid
             daily_totals["bonus_paid"] += adjustment_bonus_paid
             daily_totals["total_paid"] += adjustment_total_paid
 
             weekly_totals["people_paid"] += adjustment_people_paid
-            weekly_totals["people_denied"] = found_record["total_claiming"] - found_record["people_paid"]
+            weekly_totals["people_denied"] += adjustment_people_denied
             weekly_totals["paytime_paid"] += adjustment_amount_paid
             weekly_totals["bonus_paid"] += adjustment_bonus_paid
             weekly_totals["total_paid"] += adjustment_total_paid
 
+            self.bump_stats_version(pay_date)
             self.save_data()
+            self.bot.dispatch("pay_record_edit", interaction.user.id, record_id, before_edit, dict(found_record))
 
             # Create or update the embed
             embed = discord.Embed(
@@ -617,17 +833,29 @@ class PayTracker(commands.Cog):
             embed.add_field(name="Record ID", value=f"{record_id}", inline=False)
             embed.set_footer(text=f"Updated by {interaction.user.name}", icon_url=interaction.user.avatar.url)
 
-            message_id = found_record.get("message_id")
-            if message_id:
+            message = self.record_message(found_record)
+            if message is not None:
                 try:
-                    message = await interaction.channel.fetch_message(message_id)
                     await message.edit(embed=embed)
                 except discord.NotFound:
-                    response_message = await interaction.channel.send(embed=embed)
-                    found_record["message_id"] = response_message.id
+                    message = None
+            if (
+                message is None
+                and found_record.get("message_id")
+                and found_record.get("channel_id") != interaction.channel_id
+            ):
+                # Migrated records assume the paystat channel; before
+                # reposting, look once in the channel editpay was run from.
+                try:
+                    message = await interaction.channel.fetch_message(found_record["message_id"])
+                    await message.edit(embed=embed)
+                    found_record["channel_id"] = interaction.channel_id
                     self.save_data()
-            else:
+                except discord.NotFound:
+                    message = None
+            if message is None:
                 response_message = await interaction.channel.send(embed=embed)
+                found_record["channel_id"] = response_message.channel.id
                 found_record["message_id"] = response_message.id
                 self.save_data()
 
@@ -640,6 +868,79 @@ class PayTracker(commands.Cog):
             )
 
 
+    @app_commands.command(name="deletepay", description="Delete a payment record and reverse it from the totals.")
+    @app_commands.describe(record_id="The unique ID of the record to delete.")
+    @require_roles("stat_edit")
+    async def deletepay(self, interaction: discord.Interaction, record_id: str):
+        try:
+            found_record = self.record_index.pop(record_id, None)
+            if not found_record:
+                message = f"No record found with ID: {record_id}."
+                if record_id in self.pay_data.get("deleted_records", {}):
+                    message = f"Record {record_id} has already been deleted."
+                await interaction.response.send_message(message, ephemeral=True)
+                return
+
+            pay_date = found_record["pay_date"]
+
+            # Drop the record from its day
+            day_records = self.pay_data["records"].get(pay_date, [])
+            day_records[:] = [record for record in day_records if record is not found_record]
+            if not day_records:
+                self.pay_data["records"].pop(pay_date, None)
+
+            # Take its contribution back off the daily and weekly totals
+            for bucket, key in (("daily_totals", pay_date), ("weekly_totals", calculate_week_start(pay_date))):
+                totals = self.pay_data.get(bucket, {}).get(key)
+                if totals is None:
+                    continue
+                for field in TOTAL_FIELDS:
+                    totals[field] = totals.get(field, 0) - found_record.get(field, 0)
+
+            # Tombstone so the ID is never handed out again (within this month's file)
+            self.pay_data.setdefault("deleted_records", {})[record_id] = {
+                "deleted_by": interaction.user.id,
+                "deleted_at": datetime.now().isoformat(timespec="seconds"),
+                "record": found_record,
+            }
+
+            self.bump_stats_version(pay_date)
+            self.save_data()
+            self.bot.dispatch("pay_record_delete", interaction.user.id, record_id, dict(found_record))
+
+            await interaction.response.send_message(
+                f"Record {record_id} ({pay_date}, {found_record['pay_time']}) has been deleted.", ephemeral=True
+            )
+
+            # Strike through the posted embed
+            message = self.record_message(found_record)
+            if message is not None:
+                embed = discord.Embed(
+                    title=f"~~{pay_date}~~",
+                    description="This record has been deleted.",
+                    color=discord.Color.dark_grey(),
+                )
+                embed.add_field(name="Pay Time", value=f"~~{found_record['pay_time']}~~", inline=False)
+                embed.add_field(name="Total Claiming", value=f"~~{found_record['total_claiming']}~~", inline=False)
+                embed.add_field(name="People Paid", value=f"~~{found_record['people_paid']}~~", inline=False)
+                embed.add_field(name="People Denied", value=f"~~{found_record['people_denied']}~~", inline=False)
+                embed.add_field(name="Total Paid", value=f"~~{found_record['total_paid']}c~~", inline=False)
+                embed.add_field(name="Record ID", value=f"~~{record_id}~~", inline=False)
+                embed.set_footer(
+                    text=f"Deleted by {interaction.user.name}", icon_url=interaction.user.display_avatar.url
+                )
+                try:
+                    await message.edit(embed=embed)
+                except discord.HTTPException as e:
+                    command_logger.warning(f"Could not update embed for deleted record {record_id}: {e}")
+
+        except Exception as e:
+            command_logger.error(f"Error in deletepay command: {e}", exc_info=True)
+            if not interaction.response.is_done():
+                await interaction.response.send_message(
+                    "An error occurred while processing your request. Please contact the admin.", ephemeral=True
+                )
+
     def calculate_week_start(self, date_str: str) -> str:
         """Calculate the start of the week (Monday) for a given date."""
         date_obj = datetime.strptime(date_str, "%Y-%m-%d")
@@ -652,9 +953,7 @@ class PayTracker(commands.Cog):
     async def daystat(self, ctx, date: str):
         try:
             # Restrict command to the allowed channel from server.json
-            cfg = load_server_config()
-            admin_channel_id = cfg.get("channels", {}).get("admin_stats")
-            if not admin_channel_id or ctx.channel.id != admin_channel_id:
+            if not self.admin_stats_id or ctx.channel.id != self.admin_stats_id:
                 await ctx.message.delete()
                 return
 
@@ -662,7 +961,7 @@ class PayTracker(commands.Cog):
             datetime.strptime(date, "%Y-%m-%d")
 
             # Send the daily stats to the current channel
-            await self.send_daily_stats(ctx.channel, date)
+            await ctx.send(embed=self.stats_embed("daily", date))
 
             # Delete the command prompt
             await ctx.message.delete()
@@ -675,9 +974,7 @@ class PayTracker(commands.Cog):
     async def weekstat(self, ctx, date: str):
         try:
             # Restrict command to the allowed channel from server.json
-            cfg = load_server_config()
-            admin_channel_id = cfg.get("channels", {}).get("admin_stats")
-            if not admin_channel_id or ctx.channel.id != admin_channel_id:
+            if not self.admin_stats_id or ctx.channel.id != self.admin_stats_id:
                 await ctx.message.delete()
                 await ctx.author.send("You can only use this command in the designated stats channel.")
                 return
@@ -687,36 +984,13 @@ class PayTracker(commands.Cog):
 
             # Calculate the start of the week for the given date
             week_start_date = self.calculate_week_start(date)
-            print(f"[DEBUG] Week Start Date: {week_start_date}")  # Debug log
 
-            # Fetch weekly totals for the week starting at the calculated date
-            weekly_totals = self.pay_data.get("weekly_totals", {}).get(week_start_date, None)
-            print(f"[DEBUG] Weekly Totals Data: {weekly_totals}")  # Debug log
-
-            if not weekly_totals:
+            if week_start_date not in self.pay_data.get("weekly_totals", {}):
                 await ctx.send(f"No weekly stats found for the week starting {week_start_date}.")
                 return
 
-            # Create the weekly stats embed
-            weekly_stats_embed = discord.Embed(
-                title="Weekly Stats",
-                description=f"Summary for the week starting {week_start_date}:",
-                color=discord.Color.purple(),
-            )
-            weekly_stats_embed.add_field(name="Total People Paid", value=f"{weekly_totals['people_paid']}", inline=False)
-            weekly_stats_embed.add_field(
-                name="Total People Denied", value=f"{weekly_totals['people_denied']}", inline=False
-            )
-            weekly_stats_embed.add_field(
-                name="Total Amount Paid Out", value=f"{weekly_totals['paytime_paid']}c", inline=False
-            )
-            weekly_stats_embed.add_field(name="Total Bonus Paid", value=f"{weekly_totals['bonus_paid']}c", inline=False)
-            weekly_stats_embed.add_field(
-                name="Total Paid", value=f"{weekly_totals['total_paid']}c", inline=False
-            )
-
             # Send the embed to the current channel
-            await ctx.send(embed=weekly_stats_embed)
+            await ctx.send(embed=self.stats_embed("weekly", week_start_date))
 
             # Delete the command prompt
             await ctx.message.delete()
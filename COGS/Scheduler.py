@@ -0,0 +1,210 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import discord
+from discord.ext import commands
+
+from .Storage import CoalescingJsonWriter
+
+BASE_DIR = Path(__file__).resolve().parent          # /COGS
+ROOT_DIR = BASE_DIR.parent                          # /CDA Pay
+JSON_DIR = ROOT_DIR / "JSON"                        # /CDA Pay/JSON
+JSON_DIR.mkdir(exist_ok=True)
+SCHEDULER_STATE_FILE = JSON_DIR / "scheduler.json"
+
+# Misfire policies for runs missed while the bot was down
+MISFIRE_SKIP = "skip"           # forget missed runs, wait for the next one
+MISFIRE_RUN_ONCE = "run_once"   # run once on startup however many were missed
+MISFIRE_RUN_ALL = "run_all"     # run once per missed fire time (capped)
+MAX_CATCH_UP_RUNS = 24
+
+# Longest the loop sleeps before re-checking; covers clock jumps on the Pi.
+MAX_SLEEP = 60
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+class ScheduledJob:
+    def __init__(self, job_id, func, trigger, misfire, grace_time):
+        self.id = job_id
+        self.func = func
+        self.trigger = trigger
+        self.misfire = misfire
+        self.grace_time = grace_time
+        self.next_run = None
+        self.catch_up_runs = 0
+        self.task = None
+
+
+class SchedulerService:
+    """
+    One scheduler for every timed job in the bot.
+
+    Cogs register coroutine functions with an APScheduler trigger
+    (CronTrigger / IntervalTrigger – both timezone aware). Each job's next
+    run, last run, last duration and last error are kept in
+    JSON/scheduler.json, so a run that fell inside a restart is noticed on
+    the next start and handled according to the job's misfire policy.
+    A job never overlaps itself; a run that comes due while the previous
+    one is still going is skipped.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.jobs = {}
+        self.state = {}
+        if SCHEDULER_STATE_FILE.exists():
+            try:
+                with open(SCHEDULER_STATE_FILE, "r") as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError):
+                self.state = {}
+        self.writer = CoalescingJsonWriter(SCHEDULER_STATE_FILE, lambda: self.state)
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    # ── registration ─────────────────────────────────────
+    def add_job(self, job_id: str, func, trigger, misfire: str = MISFIRE_RUN_ONCE, grace_time: int = 300):
+        now = _utcnow()
+        job = ScheduledJob(job_id, func, trigger, misfire, grace_time)
+        job.next_run = trigger.get_next_fire_time(None, now)
+
+        missed = _parse(self.state.get(job_id, {}).get("next_run"))
+        if missed is not None and missed <= now:
+            if (now - missed).total_seconds() <= grace_time or misfire == MISFIRE_RUN_ONCE:
+                job.next_run = now
+            elif misfire == MISFIRE_RUN_ALL:
+                fire_time = missed
+                while fire_time is not None and fire_time <= now and job.catch_up_runs < MAX_CATCH_UP_RUNS:
+                    job.catch_up_runs += 1
+                    fire_time = trigger.get_next_fire_time(fire_time, fire_time + timedelta(microseconds=1))
+                job.next_run = now
+
+        self.jobs[job_id] = job
+        self._store_next_run(job)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run_loop())
+        self._wakeup.set()
+        return job
+
+    def remove_job(self, job_id: str):
+        job = self.jobs.pop(job_id, None)
+        if job is not None:
+            self._wakeup.set()
+
+    async def run_now(self, job_id: str):
+        job = self.jobs[job_id]
+        if job.task and not job.task.done():
+            return await job.task
+        job.task = asyncio.create_task(self._run(job, 1))
+        await job.task
+
+    # ── state ────────────────────────────────────────────
+    def _store_next_run(self, job: ScheduledJob):
+        entry = self.state.setdefault(job.id, {})
+        entry["next_run"] = job.next_run.isoformat() if job.next_run else None
+        self.writer.mark_dirty()
+
+    def job_state(self, job_id: str) -> dict:
+        return self.state.get(job_id, {})
+
+    # ── execution ────────────────────────────────────────
+    async def _run(self, job: ScheduledJob, runs: int):
+        for _ in range(runs):
+            started = _utcnow()
+            start = time.monotonic()
+            error = None
+            try:
+                await job.func()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                print(f"[SCHEDULER] Job {job.id} failed: {error}")
+
+            entry = self.state.setdefault(job.id, {})
+            entry["last_run"] = started.isoformat()
+            entry["last_duration"] = round(time.monotonic() - start, 3)
+            entry["last_error"] = error
+            self.writer.mark_dirty()
+
+    async def _run_loop(self):
+        await self.bot.wait_until_ready()
+        while True:
+            self._wakeup.clear()
+            now = _utcnow()
+
+            for job in list(self.jobs.values()):
+                if job.next_run is None or job.next_run > now:
+                    continue
+                runs = job.catch_up_runs or 1
+                job.catch_up_runs = 0
+                job.next_run = job.trigger.get_next_fire_time(job.next_run, now + timedelta(microseconds=1))
+                self._store_next_run(job)
+                if job.task and not job.task.done():
+                    print(f"[SCHEDULER] Job {job.id} still running, skipping this run.")
+                    continue
+                job.task = asyncio.create_task(self._run(job, runs))
+
+            upcoming = [job.next_run for job in self.jobs.values() if job.next_run]
+            timeout = MAX_SLEEP
+            if upcoming:
+                timeout = min(MAX_SLEEP, max(0.0, (min(upcoming) - _utcnow()).total_seconds()))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+def get_scheduler(bot) -> SchedulerService:
+    """The bot-wide scheduler, created on first use so cog load order doesn't matter."""
+    service = getattr(bot, "scheduler_service", None)
+    if service is None:
+        service = SchedulerService(bot)
+        bot.scheduler_service = service
+    return service
+
+
+class SchedulerCog(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    def json_writers(self) -> list:
+        # No reload_from_disk(): job state is live, so a restored
+        # scheduler.json is simply rewritten on the next change.
+        return [get_scheduler(self.bot).writer]
+
+    @commands.command(name="jobs", help="Lists scheduled jobs with their next run and last duration.")
+    @commands.is_owner()
+    async def list_jobs(self, ctx):
+        scheduler = get_scheduler(self.bot)
+        if not scheduler.jobs:
+            return await ctx.send("No scheduled jobs.", delete_after=10)
+
+        embed = discord.Embed(title="Scheduled Jobs", color=discord.Color.blurple())
+        far_future = datetime.max.replace(tzinfo=timezone.utc)
+        for job in sorted(scheduler.jobs.values(), key=lambda j: j.next_run or far_future):
+            state = scheduler.job_state(job.id)
+            next_run = f"<t:{int(job.next_run.timestamp())}:f>" if job.next_run else "never"
+            last_run = _parse(state.get("last_run"))
+            lines = [
+                f"**Next:** {next_run}",
+                f"**Last:** <t:{int(last_run.timestamp())}:R>" if last_run else "**Last:** never",
+                f"**Duration:** {state['last_duration']}s" if state.get("last_duration") is not None else "",
+                f"**Misfire:** {job.misfire}",
+            ]
+            if state.get("last_error"):
+                lines.append(f"**Error:** `{state['last_error']}`")
+            embed.add_field(name=job.id, value="\n".join(line for line in lines if line), inline=False)
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(SchedulerCog(bot))
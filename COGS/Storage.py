@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+# ===========================
+# Atomic writes
+# ===========================
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Write data to path via a temp file + rename so readers never see half a file."""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Path, text: str):
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_json(path: Path, data):
+    atomic_write_text(path, json.dumps(data, indent=4))
+
+
+class CoalescingJsonWriter:
+    """
+    Batches saves of one in-memory JSON document.
+
+    Callers mark the document dirty after each change; a single write happens
+    `delay` seconds later no matter how many changes arrived in between.
+    The document is serialised on the event loop (so the snapshot is
+    consistent) and written to disk on a worker thread.
+    """
+
+    def __init__(self, path: Path, get_data, delay: float = 2.0):
+        self.path = Path(path)
+        self.get_data = get_data
+        self.delay = delay
+        self._dirty = False
+        self._task = None
+        self._write = None       # the write currently on its worker thread
+        self._lock = asyncio.Lock()
+
+    def mark_dirty(self):
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # Changes made while a write was on its thread set _dirty again
+        # without starting a task, so keep going until nothing is left.
+        while self._dirty:
+            await asyncio.sleep(self.delay)
+            await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            payload = json.dumps(self.get_data(), indent=4)
+            self._write = asyncio.ensure_future(asyncio.to_thread(atomic_write_text, self.path, payload))
+            try:
+                # Shielded: cancelling the flush can't stop the thread, and
+                # settle() needs to see the write until it has landed.
+                await asyncio.shield(self._write)
+            except Exception:
+                self._dirty = True
+                raise
+
+    @property
+    def busy(self) -> bool:
+        """True while a write is on its worker thread."""
+        return self._write is not None and not self._write.done()
+
+    async def settle(self):
+        """Wait for a write already on its worker thread to land."""
+        if self.busy:
+            await asyncio.wait({self._write})
+
+    def discard(self):
+        """
+        Drop any pending write, e.g. when the file is replaced underneath us.
+        A write already on its worker thread can't be stopped: settle() the
+        writer before replacing the file, then discard without yielding.
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._dirty = False
+
+    def flush_now(self):
+        """Synchronous flush for cog_unload / shutdown paths."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        if self._dirty:
+            self._dirty = False
+            atomic_write_json(self.path, self.get_data())
+
+
+# Every module in COGS is loaded as an extension; this one only provides helpers.
+async def setup(bot):
+    pass
@@ -1,8 +1,310 @@
 import discord
 from discord.ext import commands
+import aiohttp
 import asyncio
-from collections import defaultdict
-from time import time
+import heapq
+import json
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from time import monotonic, perf_counter
+
+from apscheduler.triggers.interval import IntervalTrigger
+
+from .MessageRouter import MSG_DM, MSG_RELAY, get_router
+from .Metrics import metrics
+from .Scheduler import MISFIRE_SKIP, get_scheduler
+from .Storage import CoalescingJsonWriter
+
+BASE_DIR = Path(__file__).resolve().parent          # /COGS
+ROOT_DIR = BASE_DIR.parent                          # /CDA Pay
+JSON_DIR = ROOT_DIR / "JSON"                        # /CDA Pay/JSON
+JSON_DIR.mkdir(exist_ok=True)
+SERVER_CONFIG_PATH = JSON_DIR / "server.json"
+RELAY_INDEX_FILE = JSON_DIR / "relay_index.json"
+# Attachments are spooled on the bot's own disk; /tmp is RAM-backed on the Pi.
+RELAY_TMP_DIR = ROOT_DIR / "tmp"
+MESSAGE_CHAR_LIMIT = 2000
+DOWNLOAD_CHUNK = 64 * 1024
+OUTBOUND_IDLE = 300          # seconds before an unused outbound buffer is dropped
+
+
+def load_server_config():
+    default_config = {
+        "relay": {
+            "message_limit": 5,
+            "time_window": 10,
+            "max_tracked_users": 1000,
+            "autoreply_delay": 120,
+            "coalesce_window": 1.0,
+            "max_attachment_mb": 8,
+            "max_transfers": 2
+        }
+    }
+
+    if not SERVER_CONFIG_PATH.exists():
+        return default_config
+
+    try:
+        with open(SERVER_CONFIG_PATH, "r") as f:
+            data = json.load(f)
+        cfg = default_config.copy()
+        cfg_relay = cfg["relay"].copy()
+        cfg_relay.update(data.get("relay", {}))
+        cfg["relay"] = cfg_relay
+        return cfg
+    except Exception:
+        return default_config
+
+
+class RateLimiter:
+    """
+    Token bucket per user: `limit` messages per `window` seconds, O(1) per check.
+
+    Buckets live in an OrderedDict ordered by last use. A bucket untouched
+    for a whole window has refilled completely, so it is dropped without
+    changing any outcome; the oldest buckets are also dropped once more
+    than `max_tracked` users are tracked.
+    """
+
+    def __init__(self, limit: int, window: float, max_tracked: int):
+        self.capacity = float(limit)
+        self.rate = limit / window
+        self.window = window
+        self.max_tracked = max_tracked
+        self._buckets = OrderedDict()   # user_id -> (tokens, last_seen)
+
+    def allow(self, key: int) -> bool:
+        now = monotonic()
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            tokens = self.capacity
+        else:
+            tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        self._buckets[key] = (tokens, now)
+        self._evict(now)
+        return allowed
+
+    def _evict(self, now: float):
+        while len(self._buckets) > self.max_tracked:
+            self._buckets.popitem(last=False)
+        while self._buckets:
+            _, (_, last_seen) = next(iter(self._buckets.items()))
+            if now - last_seen < self.window:
+                break
+            self._buckets.popitem(last=False)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class RelayIndex:
+    """
+    User ID <-> relay channel ID, both directions, kept in JSON/relay_index.json.
+
+    Relay channels used to be found by name inside the bot's category and
+    users by name across the whole user cache; both broke on renames. The
+    relay category ID is stored alongside so it is not looked up by name
+    on every DM either.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.category_id = None
+        self.by_user = {}
+        self.by_channel = {}
+        self.load()
+        self.writer = CoalescingJsonWriter(path, self.to_json)
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[RELAY] Could not read {self.path.name}: {e}")
+            return
+        self.category_id = data.get("category_id")
+        self.by_user = {int(user_id): int(channel_id) for user_id, channel_id in data.get("channels", {}).items()}
+        self.by_channel = {channel_id: user_id for user_id, channel_id in self.by_user.items()}
+
+    def to_json(self) -> dict:
+        return {
+            "category_id": self.category_id,
+            "channels": {str(user_id): channel_id for user_id, channel_id in self.by_user.items()},
+        }
+
+    def channel_for(self, user_id: int):
+        return self.by_user.get(user_id)
+
+    def user_for(self, channel_id: int):
+        return self.by_channel.get(channel_id)
+
+    def set_category(self, category_id: int):
+        if self.category_id != category_id:
+            self.category_id = category_id
+            self.writer.mark_dirty()
+
+    def link(self, user_id: int, channel_id: int):
+        old_channel = self.by_user.pop(user_id, None)
+        if old_channel is not None:
+            self.by_channel.pop(old_channel, None)
+        old_user = self.by_channel.pop(channel_id, None)
+        if old_user is not None:
+            self.by_user.pop(old_user, None)
+        self.by_user[user_id] = channel_id
+        self.by_channel[channel_id] = user_id
+        self.writer.mark_dirty()
+
+    def unlink_channel(self, channel_id: int):
+        user_id = self.by_channel.pop(channel_id, None)
+        if user_id is not None:
+            self.by_user.pop(user_id, None)
+            self.writer.mark_dirty()
+        return user_id
+
+
+def merge_parts(parts: list, limit: int = MESSAGE_CHAR_LIMIT) -> list:
+    """Join parts with newlines into as few messages as fit under limit, keeping order."""
+    messages = []
+    current = ""
+    for part in parts:
+        while len(part) > limit:
+            if current:
+                messages.append(current)
+                current = ""
+            messages.append(part[:limit])
+            part = part[limit:]
+        if not current:
+            current = part
+        elif len(current) + 1 + len(part) <= limit:
+            current += "\n" + part
+        else:
+            messages.append(current)
+            current = part
+    if current:
+        messages.append(current)
+    return messages
+
+
+class SpooledAttachments:
+    """
+    One message's attachments, downloaded to a temp directory ahead of
+    their turn to be sent. Holds a transfer slot until close().
+    """
+
+    def __init__(self, tmp: tempfile.TemporaryDirectory, slot: asyncio.Semaphore):
+        self.tmp = tmp
+        self.slot = slot
+        self.files = []
+        self.notes = []
+
+    def close(self):
+        for f in self.files:
+            f.close()
+        self.tmp.cleanup()
+        self.slot.release()
+
+
+def _close_spooled(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is None:
+        task.result().close()
+
+
+class OutboundBuffer:
+    """
+    Relay output to one destination (relay channel or user DM).
+
+    Text added within `window` seconds of the first pending part goes out
+    as one message (or as few as the 2000-character limit allows).
+    Attachment downloads are queued in the same list, so their files go
+    out in their place: after the text before them and before anything
+    added later, however long the download takes. Sends to a destination
+    are serialised, so order is preserved.
+    """
+
+    def __init__(self, destination, window: float):
+        self.destination = destination
+        self.window = window
+        self.pending = []
+        self.last_used = monotonic()
+        self._timer = None
+        self._lock = asyncio.Lock()
+
+    def idle_for(self, now: float) -> float:
+        """Seconds since the buffer was last used, or 0 while it has work."""
+        if self.pending or self._timer is not None or self._lock.locked():
+            return 0
+        return now - self.last_used
+
+    def add(self, text: str):
+        self.pending.append(text)
+        self.last_used = monotonic()
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().create_task(self._flush_later())
+
+    def add_transfer(self, transfer: asyncio.Task):
+        """Queue a task resolving to SpooledAttachments; call flush() to send it."""
+        self.pending.append(transfer)
+        self.last_used = monotonic()
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.window)
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f"[RELAY] Failed to send to {self.destination}: {e}")
+
+    async def flush(self):
+        """Send everything pending in order, waiting for queued downloads."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            parts, self.pending = self.pending, []
+            queue = iter(parts)
+            text = []
+            try:
+                for part in queue:
+                    if isinstance(part, str):
+                        text.append(part)
+                        continue
+                    spooled = await part
+                    try:
+                        await self._send(text + spooled.notes, spooled.files)
+                    finally:
+                        spooled.close()
+                    text = []
+                if text:
+                    await self._send(text)
+            except BaseException:
+                # Downloads queued behind a failed send still hold a slot
+                for part in queue:
+                    if not isinstance(part, str):
+                        part.add_done_callback(_close_spooled)
+                raise
+            metrics.incr("relay.parts", len(parts))
+            self.last_used = monotonic()
+
+    async def _send(self, parts: list, files=()):
+        """Send merged text; files go with the last message."""
+        messages = merge_parts(parts)
+        if not messages and files:
+            messages = [None]
+        for i, content in enumerate(messages):
+            extra = {"files": list(files)} if files and i == len(messages) - 1 else {}
+            start = perf_counter()
+            try:
+                await self.destination.send(content, **extra)
+            finally:
+                metrics.observe("relay.send", perf_counter() - start)
+        metrics.incr("relay.messages", len(messages))
 
 
 class MessagingSystem(commands.Cog):
@@ -12,111 +314,367 @@ class MessagingSystem(commands.Cog):
         self.last_message_timestamps = {}
         self.autoreply_user_id = 298121351871594497
 
-        # Spam protection
-        self.MESSAGE_LIMIT = 5  # Maximum allowed messages
-        self.TIME_WINDOW = 10  # Time window in seconds
-        self.message_tracker = defaultdict(list)  # Tracks message timestamps by user
+        # Spam protection for DMs into the relay
+        relay_cfg = load_server_config()["relay"]
+        self.spam_limiter = RateLimiter(
+            int(relay_cfg.get("message_limit", 5)),
+            float(relay_cfg.get("time_window", 10)),
+            int(relay_cfg.get("max_tracked_users", 1000))
+        )
 
-        # Auto-reply tracking
-        self.pending_replies = {}  # Tracks if an auto-reply is pending for a channel
+        # User <-> relay channel index
+        self.relay_index = RelayIndex(RELAY_INDEX_FILE)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        # Ignore bot messages
-        if message.author.bot:
-            return
+        # Auto-reply deadlines: channel_id -> (deadline, user_id). The heap holds
+        # (deadline, channel_id); cancelled entries are skipped when popped.
+        self.autoreply_delay = float(relay_cfg.get("autoreply_delay", 120))
+        self.autoreply_deadlines = {}
+        self._autoreply_heap = []
+        self._autoreply_wakeup = asyncio.Event()
+        self._autoreply_task = None
 
-        # Check for spam
-        if not await self.check_spam(message.author):
-            await message.channel.send("You are sending messages too quickly. Please slow down.")
-            return
+        # Outbound buffers by destination ID (relay channel or user)
+        self.coalesce_window = float(relay_cfg.get("coalesce_window", 1.0))
+        self.outbound = {}
 
-        # Retrieve the guild
-        guild = self.bot.get_guild(self.guild_id)
-        if not guild:
-            print("Guild not found. Check guild ID.")
-            return
+        # Attachment relay: per-message size cap and concurrent transfer limit
+        self.max_attachment_bytes = int(float(relay_cfg.get("max_attachment_mb", 8)) * 1024 * 1024)
+        self.transfer_slots = asyncio.Semaphore(int(relay_cfg.get("max_transfers", 2)))
+        self.http_session = None
+
+    async def cog_load(self):
+        self.http_session = aiohttp.ClientSession()
+        self._autoreply_task = asyncio.create_task(self.run_autoreplies())
+
+        router = get_router(self.bot)
+        router.relay_check = self.is_relay_channel
+        router.subscribe(MSG_DM, "relay_dm", self.handle_dm)
+        router.subscribe(MSG_RELAY, "relay_reply", self.handle_relay_reply)
+
+        get_scheduler(self.bot).add_job(
+            "relay_buffer_sweep",
+            self.sweep_outbound,
+            IntervalTrigger(minutes=10),
+            misfire=MISFIRE_SKIP,
+        )
+
+    async def sweep_outbound(self):
+        """Drop outbound buffers that have been idle, so one isn't kept per user forever."""
+        now = monotonic()
+        idle = [dest_id for dest_id, buffer in self.outbound.items() if buffer.idle_for(now) > OUTBOUND_IDLE]
+        for dest_id in idle:
+            del self.outbound[dest_id]
+        metrics.gauge("relay.outbound_buffers", len(self.outbound))
+
+    def snapshot_files(self) -> dict:
+        """Relay index serialised from memory for backups."""
+        return {RELAY_INDEX_FILE.name: json.dumps(self.relay_index.to_json(), indent=4).encode("utf-8")}
+
+    def json_writers(self) -> list:
+        return [self.relay_index.writer]
+
+    def reload_from_disk(self):
+        """Re-read the relay index after a backup restore."""
+        self.relay_index.writer.discard()
+        self.relay_index = RelayIndex(RELAY_INDEX_FILE)
+
+    async def cog_unload(self):
+        router = get_router(self.bot)
+        router.unsubscribe("relay_dm")
+        router.unsubscribe("relay_reply")
+        if router.relay_check == self.is_relay_channel:
+            router.relay_check = None
+
+        get_scheduler(self.bot).remove_job("relay_buffer_sweep")
+        if self._autoreply_task is not None:
+            self._autoreply_task.cancel()
+        for buffer in self.outbound.values():
+            try:
+                await buffer.flush()
+            except Exception as e:
+                print(f"[RELAY] Failed to flush relay buffer on unload: {e}")
+        self.relay_index.writer.flush_now()
+        if self.http_session is not None:
+            await self.http_session.close()
+
+    async def relay(self, destination, text: str, attachments=()):
+        """Queue text for destination; attachments start downloading now and are sent in order."""
+        buffer = self.outbound.get(destination.id)
+        if buffer is None:
+            buffer = self.outbound[destination.id] = OutboundBuffer(destination, self.coalesce_window)
+        if text:
+            buffer.add(text)
+        if attachments:
+            buffer.add_transfer(asyncio.create_task(self.spool_attachments(attachments)))
+            await buffer.flush()
 
-        # DM Handling
-        if isinstance(message.channel, discord.DMChannel):
+    # ── attachments ──────────────────────────────────────
+    async def download(self, attachment: discord.Attachment, path: Path):
+        """
+        Stream an attachment to disk in chunks instead of reading it into
+        memory. File I/O runs in a worker thread so the loop never blocks.
+        """
+        written = 0
+        async with self.http_session.get(attachment.url) as resp:
+            resp.raise_for_status()
+            f = await asyncio.to_thread(open, path, "wb")
+            try:
+                async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK):
+                    written += len(chunk)
+                    if written > self.max_attachment_bytes:
+                        raise ValueError("attachment larger than advertised")
+                    await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+        metrics.incr("relay.attachment_bytes", written)
+
+    async def spool_attachments(self, attachments) -> SpooledAttachments:
+        """
+        Download a message's attachments to a temp directory under
+        RELAY_TMP_DIR, for OutboundBuffer to upload from the file handles.
+        At most `max_transfers` messages are transferring at once; anything
+        pushing the message past the size cap is listed instead of sent.
+        """
+        allowed, skipped = [], []
+        total = 0
+        for attachment in attachments:
+            if total + attachment.size > self.max_attachment_bytes:
+                skipped.append(attachment.filename)
+                continue
+            total += attachment.size
+            allowed.append(attachment)
+
+        failed = []
+        await self.transfer_slots.acquire()
+        RELAY_TMP_DIR.mkdir(exist_ok=True)
+        spooled = SpooledAttachments(
+            tempfile.TemporaryDirectory(prefix="relay-", dir=RELAY_TMP_DIR), self.transfer_slots
+        )
+        try:
+            for i, attachment in enumerate(allowed):
+                path = Path(spooled.tmp.name) / f"{i}-{attachment.filename}"
+                try:
+                    await self.download(attachment, path)
+                except (aiohttp.ClientError, ValueError, OSError) as e:
+                    print(f"[RELAY] Failed to download {attachment.filename}: {e}")
+                    failed.append(attachment.filename)
+                    continue
+                spooled.files.append(discord.File(path, filename=attachment.filename, spoiler=attachment.is_spoiler()))
+        except BaseException:
+            spooled.close()
+            raise
+
+        limit_mb = self.max_attachment_bytes / (1024 * 1024)
+        if skipped:
+            spooled.notes.append(f"-# Not relayed (over {limit_mb:g} MB): {', '.join(skipped)}")
+        if failed:
+            spooled.notes.append(f"-# Could not relay: {', '.join(failed)}")
+        return spooled
+
+    async def get_relay_category(self, guild):
+        """The bot's relay category, by stored ID; falls back to the name once and remembers it."""
+        category = guild.get_channel(self.relay_index.category_id) if self.relay_index.category_id else None
+        if not isinstance(category, discord.CategoryChannel):
             category_name = self.bot.user.name  # Use the bot's name as the category name
             category = discord.utils.get(guild.categories, name=category_name)
 
             # Create category if it doesn't exist
             if not category:
                 category = await guild.create_category(category_name)
+            self.relay_index.set_category(category.id)
+        return category
 
-            # Find or create the user's channel
-            channel_name = f"{message.author.name.lower()}"  # No discriminator needed
-            existing_channel = discord.utils.get(category.channels, name=channel_name)
-
-            if not existing_channel:
-                overwrites = {
-                    guild.default_role: discord.PermissionOverwrite(read_messages=False),
-                    guild.me: discord.PermissionOverwrite(read_messages=True),
-                }
-                existing_channel = await guild.create_text_channel(
-                    channel_name, category=category, overwrites=overwrites
-                )
-                await existing_channel.send(
-                    f"# Channel created {message.author.mention}."
-                )
+    async def get_relay_channel(self, guild, user):
+        """The user's relay channel, created (and indexed) on first contact."""
+        channel_id = self.relay_index.channel_for(user.id)
+        channel = guild.get_channel(channel_id) if channel_id else None
+        if channel is not None:
+            return channel
 
-            # Forward the user's DM to the channel
-            await existing_channel.send(
-                f"{message.content}"
-            )
+        category = await self.get_relay_category(guild)
 
-            # Update last message timestamp
-            self.last_message_timestamps[message.author.id] = asyncio.get_event_loop().time()
+        # Channels from before the index existed are matched by name once
+        channel_name = f"{user.name.lower()}"  # No discriminator needed
+        channel = discord.utils.get(category.channels, name=channel_name)
 
-            # Schedule the auto-reply if the user is the target ID
-            if message.author.id == self.autoreply_user_id:
-                self.pending_replies[existing_channel.id] = True
-                await asyncio.create_task(
-                    self.schedule_autoreply(guild, message.author, message.channel, existing_channel))
+        if not channel:
+            overwrites = {
+                guild.default_role: discord.PermissionOverwrite(read_messages=False),
+                guild.me: discord.PermissionOverwrite(read_messages=True),
+            }
+            channel = await guild.create_text_channel(
+                channel_name, category=category, overwrites=overwrites
+            )
+            self.relay_index.link(user.id, channel.id)
+            await channel.send(
+                f"# Channel created {user.mention}."
+            )
+        else:
+            self.relay_index.link(user.id, channel.id)
+        return channel
 
-        # Channel Handling in DMs Category
-        elif message.channel.category and message.channel.category.name == self.bot.user.name:
-            # Mark that a response was made in the channel
-            self.pending_replies[message.channel.id] = False
+    async def get_relay_user(self, channel):
+        """The user a relay channel belongs to, or None if the channel isn't a relay channel."""
+        user_id = self.relay_index.user_for(channel.id)
+        if user_id is None:
+            # Channels from before the index existed are matched by name once
+            user = self.user_by_channel_name(channel)
+            if user is None:
+                return None
+            self.relay_index.link(user.id, channel.id)
+            return user
 
+        user = self.bot.get_user(user_id)
+        if user is None:
             try:
-                username = message.channel.name
-                user = discord.utils.get(self.bot.users, name=username)
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                self.relay_index.unlink_channel(channel.id)
+                return None
+        return user
 
-                if user:
-                    # Forward message to the user in their DM
-                    await user.send(f"**Reply from {message.author}:**\n{message.content}")
-                else:
-                    await message.channel.send("User not found. Unable to send the message.")
+    def user_by_channel_name(self, channel):
+        """
+        Exact username match only, as relay channels are named after the
+        username. Nicknames and display names are never used, so a
+        channel can't be linked to the wrong person.
+        """
+        return discord.utils.get(self.bot.users, name=channel.name)
 
-            except ValueError:
-                await message.channel.send("Channel name format is invalid.")
+    def is_relay_channel(self, channel) -> bool:
+        if channel.guild.id != self.guild_id:
+            return False
+        if channel.id in self.relay_index.by_channel:
+            return True
+        category = getattr(channel, "category", None)
+        if category is None:
+            return False
+        if self.relay_index.category_id is not None:
+            return category.id == self.relay_index.category_id
+        return category.name == self.bot.user.name
 
-    async def check_spam(self, user):
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        if channel.guild.id != self.guild_id or not isinstance(channel, discord.TextChannel):
+            return
+        if channel.id in self.relay_index.by_channel or not self.is_relay_channel(channel):
+            return
+        # A relay channel made by hand: index it only if its name is exactly a username
+        user = self.user_by_channel_name(channel)
+        if user is not None and self.relay_index.channel_for(user.id) is None:
+            self.relay_index.link(user.id, channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if isinstance(channel, discord.CategoryChannel):
+            if channel.id == self.relay_index.category_id:
+                self.relay_index.set_category(None)
+            return
+        self.relay_index.unlink_channel(channel.id)
+
+    # ── routed messages ──────────────────────────────────
+    async def handle_dm(self, message):
+        # Check for spam - only DMs feed the relay, so only DMs are limited
+        if not self.check_spam(message.author):
+            await message.channel.send("You are sending messages too quickly. Please slow down.")
+            return
+
+        # Retrieve the guild
+        guild = self.bot.get_guild(self.guild_id)
+        if not guild:
+            print("Guild not found. Check guild ID.")
+            return
+
+        existing_channel = await self.get_relay_channel(guild, message.author)
+
+        # Forward the user's DM to the channel
+        await self.relay(existing_channel, message.content, message.attachments)
+
+        # Update last message timestamp
+        self.last_message_timestamps[message.author.id] = asyncio.get_event_loop().time()
+
+        # Schedule the auto-reply if the user is the target ID
+        if message.author.id == self.autoreply_user_id:
+            self.schedule_autoreply(existing_channel.id, message.author.id)
+
+    async def handle_relay_reply(self, message):
+        # A response was made in the channel, so no auto-reply is needed
+        self.cancel_autoreply(message.channel.id)
+
+        user = await self.get_relay_user(message.channel)
+
+        if user:
+            # Forward message to the user in their DM
+            await self.relay(
+                user, f"**Reply from {message.author}:**\n{message.content}",
+                message.attachments
+            )
+        else:
+            await message.channel.send("User not found. Unable to send the message.")
+
+    def check_spam(self, user):
         """Check if the user is spamming messages."""
-        now = time()
-        user_timestamps = self.message_tracker[user.id]
+        return self.spam_limiter.allow(user.id)
+
+    # ── auto-replies ─────────────────────────────────────
+    def schedule_autoreply(self, channel_id: int, user_id: int):
+        """Start the auto-reply countdown for a channel unless one is already running."""
+        if channel_id in self.autoreply_deadlines:
+            return
+        deadline = monotonic() + self.autoreply_delay
+        self.autoreply_deadlines[channel_id] = (deadline, user_id)
+        heapq.heappush(self._autoreply_heap, (deadline, channel_id))
+        if self._autoreply_heap[0][1] == channel_id:
+            self._autoreply_wakeup.set()
 
-        # Add the current timestamp
-        user_timestamps.append(now)
+    def cancel_autoreply(self, channel_id: int):
+        if self.autoreply_deadlines.pop(channel_id, None) is None:
+            return
+        # Rebuild once cancelled entries outnumber live ones
+        if len(self._autoreply_heap) > 2 * len(self.autoreply_deadlines) + 16:
+            self._autoreply_heap = [
+                (deadline, cid) for cid, (deadline, _) in self.autoreply_deadlines.items()
+            ]
+            heapq.heapify(self._autoreply_heap)
 
-        # Remove timestamps outside the time window
-        self.message_tracker[user.id] = [ts for ts in user_timestamps if now - ts <= self.TIME_WINDOW]
+    def pop_due_autoreplies(self) -> list:
+        now = monotonic()
+        due = []
+        while self._autoreply_heap and self._autoreply_heap[0][0] <= now:
+            deadline, channel_id = heapq.heappop(self._autoreply_heap)
+            entry = self.autoreply_deadlines.get(channel_id)
+            if entry is None or entry[0] != deadline:
+                continue  # cancelled
+            del self.autoreply_deadlines[channel_id]
+            due.append(entry[1])
+        return due
 
-        # Check if user exceeds the message limit
-        return len(self.message_tracker[user.id]) <= self.MESSAGE_LIMIT
+    async def run_autoreplies(self):
+        """Sleep until the earliest auto-reply deadline, send what's due, repeat."""
+        await self.bot.wait_until_ready()
+        while True:
+            self._autoreply_wakeup.clear()
+            timeout = None
+            if self._autoreply_heap:
+                timeout = max(0.0, self._autoreply_heap[0][0] - monotonic())
+            try:
+                await asyncio.wait_for(self._autoreply_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
 
-    async def schedule_autoreply(self, guild, target_user, original_dm_channel, existing_channel):
-        await asyncio.sleep(120)  # Wait 5 minutes (300 seconds)
+            for user_id in self.pop_due_autoreplies():
+                try:
+                    await self.send_autoreply(user_id)
+                except Exception as e:
+                    print(f"[RELAY] Failed to send auto-reply to {user_id}: {e}")
 
-        # Check if a response has already been made in the channel
-        if not self.pending_replies.get(existing_channel.id, True):
-            return  # Do not send the auto-reply if a response has been given
+    async def send_autoreply(self, user_id: int):
+        target_user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+        original_dm_channel = target_user.dm_channel or await target_user.create_dm()
 
         # Fetch the member from the guild
-        member = guild.get_member(target_user.id)
+        guild = self.bot.get_guild(self.guild_id)
+        member = guild.get_member(user_id) if guild else None
 
         if member:
             automessageadd = "\nYour message has been sent to the autoreply server."